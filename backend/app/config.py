@@ -52,7 +52,57 @@ class Settings(BaseSettings):
     nominatim_base_url: str = "https://nominatim.openstreetmap.org"
     nominatim_timeout: int = 10
 
+    # Локальные данные улиц
+    street_geometry_cache_size: int = Field(
+        default=512, description="Max streets kept in each geometry cache (LRU)"
+    )
+    street_name_resolution_cache_size: int = Field(
+        default=4096, description="Max memoised street name -> key resolutions"
+    )
+    street_search_cache_size: int = Field(
+        default=2048, description="Max cached autocomplete results (LRU)"
+    )
+    street_data_watch_seconds: int = Field(
+        default=0,
+        description="Poll interval of the streets JSON for hot reload (0 - off)",
+    )
+    street_popularity_refresh_seconds: int = Field(
+        default=300,
+        description="Refresh interval of street popularity from repair works (0 - off)",
+    )
+    street_popularity_weight: float = Field(
+        default=1.0, description="Exponent of street usage in autocomplete ranking"
+    )
+    street_serialized_cache_mb: int = Field(
+        default=128, description="Memory bound of serialized geometry responses (MB)"
+    )
+    street_compressed_cache_mb: int = Field(
+        default=64, description="Memory bound of precompressed geometry responses (MB)"
+    )
+    street_http_cache_seconds: int = Field(
+        default=0,
+        description="Cache-Control max-age of street data responses (0 - revalidate)",
+    )
+
+    # Векторные тайлы
+    tile_cache_size: int = Field(
+        default=1024, description="Max vector tiles kept in memory (LRU)"
+    )
+    tile_cache_dir: str | None = Field(
+        default="cache/tiles", description="On-disk vector tile cache (empty - off)"
+    )
+    tile_disk_cache_mb: int = Field(
+        default=256, description="Max size of the on-disk vector tile cache (0 - off)"
+    )
+    tile_works_check_seconds: float = Field(
+        default=5.0,
+        description="How often tiles re-check the repair works table fingerprint",
+    )
+
     # Безопасность
+    admin_token: str | None = Field(
+        default=None, description="Token for admin endpoints (X-Admin-Token header)"
+    )
     secret_key: str = Field(
         default="your-secret-key-here", description="Secret key for JWT tokens"
     )
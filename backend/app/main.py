@@ -2,8 +2,9 @@
 Главный модуль FastAPI приложения
 """
 
+import asyncio
 import os
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 import structlog
 from fastapi import FastAPI, Request, status
@@ -13,7 +14,12 @@ from fastapi.staticfiles import StaticFiles
 
 from .config import get_settings
 from .database import check_db_connection, create_tables
-from .routers import repair_works, repair_work_photos, streets, work_types
+from .routers import repair_works, repair_work_photos, streets, tiles, work_types
+from .services.fast_geometry_service import (
+    init_fast_geometry_service,
+    run_street_data_watch,
+)
+from .services.street_popularity_service import run_street_popularity_refresh
 from .utils.exceptions import BaseAPIException
 
 # Настройка логирования
@@ -57,6 +63,31 @@ async def lifespan(app: FastAPI):
     os.makedirs("frontend/static/css", exist_ok=True)
     os.makedirs("frontend/static/js", exist_ok=True)
 
+    # Строим общий индекс улиц один раз на процесс
+    street_index = init_fast_geometry_service()
+    logger.info(
+        "Street index ready", streets_count=street_index.get_available_streets_count()
+    )
+
+    # Популярность улиц для автокомплита обновляется в фоне
+    background_tasks = []
+    if settings.street_popularity_refresh_seconds > 0:
+        background_tasks.append(
+            asyncio.create_task(
+                run_street_popularity_refresh(
+                    settings.street_popularity_refresh_seconds
+                )
+            )
+        )
+
+    # Горячая перезагрузка индекса улиц при изменении JSON файла
+    if settings.street_data_watch_seconds > 0:
+        background_tasks.append(
+            asyncio.create_task(
+                run_street_data_watch(settings.street_data_watch_seconds)
+            )
+        )
+
     logger.info("Application started successfully")
 
     yield
@@ -64,6 +95,11 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down application")
 
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
 
 # Создание приложения
 app = FastAPI(
@@ -145,6 +181,8 @@ app.include_router(repair_work_photos.router, tags=["Repair Work Photos"])
 
 app.include_router(streets.router, prefix="/api/v1/streets", tags=["Streets"])
 
+app.include_router(tiles.router, prefix="/api/v1/tiles", tags=["Tiles"])
+
 
 # Статические файлы (только если директории существуют)
 if os.path.exists("frontend/static"):
@@ -2,20 +2,46 @@
 Роутер для поиска улиц и работы с геолокацией
 """
 
+import asyncio
+import secrets
+
 import structlog
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
+from ..config import get_settings
 from ..schemas.street import (
+    EncodedStreetGeometry,
+    GeometryFormat,
     ReverseGeocodeResult,
     StreetGeometry,
+    StreetGeometryBatchRequest,
+    StreetGeometryBatchResponse,
     StreetSearchQuery,
     StreetSearchResult,
 )
-from ..services.fast_geometry_service import FastGeometryService
-from ..services.street_service import StreetService
+from ..services.fast_geometry_service import (
+    FastGeometryService,
+    get_fast_geometry_service,
+    reload_fast_geometry_service,
+    tolerance_for_zoom,
+)
+from ..services.street_service import MAX_SNAP_DISTANCE_M, StreetService
+from ..utils.compression import choose_encoding
+from ..utils.http_cache import (
+    NO_CACHE,
+    cache_headers,
+    content_etag,
+    etag_matches,
+    make_etag,
+    not_modified,
+    public_cache_control,
+)
+from ..utils.street_names import search_tokens
 
 logger = structlog.get_logger(__name__)
+settings = get_settings()
 router = APIRouter()
 
 
@@ -84,24 +110,46 @@ async def get_street_geometry(
 async def reverse_geocode(
     lat: float = Query(..., ge=-90, le=90, description="Широта"),
     lon: float = Query(..., ge=-180, le=180, description="Долгота"),
+    house_number: bool = Query(
+        False, description="Нужен номер дома (запрос к Nominatim)"
+    ),
+    max_distance: float = Query(
+        MAX_SNAP_DISTANCE_M,
+        gt=0,
+        le=1000,
+        description="Максимальное расстояние до улицы в метрах (локальный режим)",
+    ),
     service: StreetService = Depends(),
 ) -> ReverseGeocodeResult | None:
     """
     Обратное геокодирование - получить адрес по координатам
 
+    По умолчанию отвечает локальный пространственный индекс улиц: ближайшая
+    улица, расстояние и точка привязки. Nominatim вызывается только если
+    нужен номер дома (house_number=true).
+
     Args:
         lat: Широта
         lon: Долгота
+        house_number: Нужен ли номер дома
+        max_distance: Максимальное расстояние до улицы (локальный режим)
         service: Сервис для работы с улицами
 
     Returns:
         Информация об адресе или None если не найдена
     """
-    logger.info("Reverse geocoding", lat=lat, lon=lon)
+    logger.info("Reverse geocoding", lat=lat, lon=lon, house_number=house_number)
 
-    result = await service.reverse_geocode(lat, lon)
+    if house_number:
+        result = await service.reverse_geocode(lat, lon)
+    else:
+        result = service.reverse_geocode_local(lat, lon, max_distance)
 
-    logger.info("Reverse geocoding completed", found=result is not None)
+    logger.info(
+        "Reverse geocoding completed",
+        found=result is not None,
+        source=result.source if result else None,
+    )
     return result
 
 
@@ -134,20 +182,48 @@ async def get_all_street_segments(
     return results
 
 
-@router.get("/fast-geometry/{street_name}", response_model=StreetGeometry | None)
+@router.get(
+    "/fast-geometry/{street_name}",
+    response_model=StreetGeometry | EncodedStreetGeometry | None,
+)
 async def get_fast_street_geometry(
     street_name: str,
     fuzzy_threshold: int = Query(
         70, ge=50, le=100, description="Минимальный порог схожести для fuzzy matching"
     ),
     street_key: str = Query(None, description="Ключ улицы для прямого поиска"),
-) -> StreetGeometry | None:
+    zoom: int | None = Query(
+        None, ge=0, le=22, description="Масштаб карты для упрощения геометрии"
+    ),
+    tolerance: float | None = Query(
+        None, ge=0, description="Допуск упрощения геометрии в метрах"
+    ),
+    format: GeometryFormat = Query(
+        GeometryFormat.JSON, description="Формат сегментов: json, polyline, quantized"
+    ),
+    if_none_match: str | None = Header(None, description="ETag закэшированного ответа"),
+    accept_encoding: str | None = Header(None, description="Допустимые кодировки"),
+    service: FastGeometryService = Depends(get_fast_geometry_service),
+) -> Response | None:
     """
     Быстрое получение геометрии улицы из локального JSON кэша
 
+    Без zoom и tolerance возвращается полная геометрия. Иначе выбирается
+    заранее упрощенный уровень, отклонение которого не превышает tolerance
+    (или размер пикселя на заданном zoom).
+
+    ETag зависит от версии набора данных, ключа улицы, уровня упрощения,
+    формата и кодировки сжатия; при совпадении с If-None-Match возвращается
+    304 без тела. Сжатие (brotli или gzip по Accept-Encoding) выполняется
+    один раз на улицу, далее отдаются готовые байты.
+
     Args:
         street_name: Название улицы для поиска
         fuzzy_threshold: Минимальный порог схожести для fuzzy matching (50-100)
+        zoom: Масштаб карты (0-22)
+        tolerance: Допуск упрощения в метрах (имеет приоритет над zoom)
+        format: Формат сегментов (polyline и quantized в разы компактнее json)
+        service: Общий индекс улиц
 
     Returns:
         Геометрия улицы или None если не найдена
@@ -157,48 +233,153 @@ async def get_fast_street_geometry(
         street_name=street_name,
         fuzzy_threshold=fuzzy_threshold,
         decoded_name=street_name,
+        zoom=zoom,
+        tolerance=tolerance,
+        format=format,
     )
 
-    service = FastGeometryService()
-    geometry = service.find_street_geometry(street_name, fuzzy_threshold, street_key)
-
-    if geometry:
-        segments_count = len(geometry.segments) if geometry.segments else 0
-        coordinates_count = len(geometry.coordinates) if geometry.coordinates else 0
-        logger.info(
-            "Fast street geometry completed - FOUND",
-            street_name=street_name,
-            segments_count=segments_count,
-            coordinates_count=coordinates_count,
-        )
-    else:
+    if tolerance is None:
+        tolerance = tolerance_for_zoom(zoom) if zoom is not None else 0.0
+    matched_key = service.find_street_key(street_name, fuzzy_threshold, street_key)
+
+    if matched_key is None:
         logger.warning(
             "Fast street geometry completed - NOT FOUND", street_name=street_name
         )
+        return None
+
+    encoding = choose_encoding(accept_encoding)
+    etag = make_etag(
+        service.data_version,
+        matched_key,
+        service.geometry_level_for_tolerance(tolerance),
+        format.value,
+        encoding or "identity",
+    )
+    cache_control = public_cache_control(settings.street_http_cache_seconds)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, cache_control, vary="Accept-Encoding")
 
-    return geometry
+    # Сериализация и сжатие при промахе кэша выполняются вне event loop
+    body, content_encoding = await asyncio.to_thread(
+        service.street_geometry_body, matched_key, tolerance, format, encoding
+    )
+    logger.info(
+        "Fast street geometry completed - FOUND",
+        street_name=street_name,
+        response_bytes=len(body),
+        content_encoding=content_encoding,
+    )
+    headers = cache_headers(etag, cache_control, vary="Accept-Encoding")
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+    # Готовое тело ответа отдается без повторной валидации response_model
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.post("/fast-geometry:batch", response_model=StreetGeometryBatchResponse)
+async def get_fast_street_geometries(
+    request: StreetGeometryBatchRequest,
+    service: FastGeometryService = Depends(get_fast_geometry_service),
+) -> Response:
+    """
+    Геометрия нескольких улиц одним запросом
+
+    Каждая уникальная улица из запроса обрабатывается один раз; для не
+    найденных улиц возвращается status=not_found. Параметры zoom, tolerance
+    и format работают так же, как в /fast-geometry/{street_name}.
+
+    Args:
+        request: Ключи улиц и параметры геометрии
+        service: Общий индекс улиц
+
+    Returns:
+        Результаты по улицам в порядке запроса
+    """
+    logger.info(
+        "Getting fast street geometries batch",
+        streets_count=len(request.street_keys),
+        format=request.format,
+    )
+
+    tolerance = request.tolerance
+    if tolerance is None:
+        tolerance = (
+            tolerance_for_zoom(request.zoom) if request.zoom is not None else 0.0
+        )
+    # Нечеткий поиск и сериализация при промахах кэша выполняются вне event loop
+    body = await asyncio.to_thread(
+        service.street_geometries_json,
+        request.street_keys,
+        request.fuzzy_threshold,
+        tolerance,
+        request.format,
+    )
+    # Тело собрано из готовых ответов без повторной валидации response_model
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/nearby")
+async def get_nearby_streets(
+    lat: float = Query(..., ge=-90, le=90, description="Широта"),
+    lon: float = Query(..., ge=-180, le=180, description="Долгота"),
+    radius: float = Query(50, gt=0, le=2000, description="Радиус поиска в метрах"),
+    limit: int = Query(5, ge=1, le=50, description="Максимальное количество улиц"),
+    service: FastGeometryService = Depends(get_fast_geometry_service),
+):
+    """
+    Улицы рядом с точкой по локальным данным (пространственный индекс)
+
+    Args:
+        lat: Широта точки
+        lon: Долгота точки
+        radius: Радиус поиска в метрах
+        limit: Максимальное количество улиц
+        service: Общий индекс улиц
+
+    Returns:
+        Улицы по возрастанию расстояния с ближайшей точкой на каждой
+    """
+    return service.find_streets_within(lat, lon, radius, limit)
 
 
 @router.get("/fast-search")
 async def fast_street_search(
+    response: Response,
     q: str = Query(..., min_length=2, max_length=200, description="Поисковый запрос"),
     limit: int = Query(
         10, ge=1, le=50, description="Максимальное количество результатов"
     ),
+    if_none_match: str | None = Header(None, description="ETag закэшированного ответа"),
+    service: FastGeometryService = Depends(get_fast_geometry_service),
 ):
     """
     Быстрый поиск улиц по префиксу из локального кэша
 
+    ETag зависит от версии набора данных, популярности улиц, нормализованного
+    запроса и лимита.
+
     Args:
         q: поисковый запрос (минимум 2 символа)
         limit: максимальное количество результатов (от 1 до 50)
+        service: Общий индекс улиц
 
     Returns:
         Список найденных улиц из локального кэша
     """
     logger.info("Fast street search", query=q, limit=limit)
 
-    service = FastGeometryService()
+    etag = make_etag(
+        service.data_version,
+        service.popularity_version,
+        " ".join(search_tokens(q)),
+        limit,
+    )
+    cache_control = public_cache_control(settings.street_http_cache_seconds)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, cache_control)
+    response.headers.update(cache_headers(etag, cache_control))
+
     street_data_list = service.search_streets_by_prefix(q, limit)
 
     # Преобразуем в формат, совместимый с фронтендом
@@ -217,20 +398,71 @@ async def fast_street_search(
 
 
 @router.get("/cache/stats")
-async def get_cache_stats():
+async def get_cache_stats(
+    if_none_match: str | None = Header(None, description="ETag закэшированного ответа"),
+    service: FastGeometryService = Depends(get_fast_geometry_service),
+):
     """
     Получить статистику локального кэша улиц
 
+    Статистика меняется с каждым запросом, поэтому ответ проверяется при
+    каждом обращении (no-cache) по ETag от содержимого.
+
     Returns:
-        Информация о количестве улиц в кэше
+        Информация о количестве улиц и статистика LRU кэшей (записи, попадания,
+        промахи)
     """
-    service = FastGeometryService()
     streets_count = service.get_available_streets_count()
 
+    response = JSONResponse(
+        {
+            "status": "OK",
+            "total_streets": streets_count,
+            "cache_loaded": streets_count > 0,
+            "caches": service.cache_stats(),
+        }
+    )
+    etag = content_etag(response.body)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, NO_CACHE)
+    response.headers.update(cache_headers(etag, NO_CACHE))
+    return response
+
+
+@router.post("/cache/reload")
+async def reload_street_cache(
+    x_admin_token: str | None = Header(None, description="Токен администратора"),
+):
+    """
+    Перезагрузить локальные данные улиц без перезапуска
+
+    Новый индекс строится в фоновом потоке и атомарно подменяет текущий;
+    запросы, начатые до подмены, дорабатывают на старых данных. Требуется
+    заголовок X-Admin-Token; без ADMIN_TOKEN в настройках перезагрузка
+    через API отключена. Перезагружается индекс только того процесса,
+    который обработал запрос - для нескольких воркеров используйте
+    STREET_DATA_WATCH_SECONDS.
+
+    Returns:
+        Количество улиц в новом индексе
+    """
+    if not settings.admin_token:
+        raise HTTPException(
+            status_code=403, detail="Перезагрузка отключена: ADMIN_TOKEN не задан"
+        )
+    if not secrets.compare_digest(x_admin_token or "", settings.admin_token):
+        raise HTTPException(status_code=403, detail="Недостаточно прав доступа")
+
+    try:
+        service = await asyncio.to_thread(reload_fast_geometry_service)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Ошибка перезагрузки данных улиц: {str(e)}"
+        ) from e
+
     return {
         "status": "OK",
-        "total_streets": streets_count,
-        "cache_loaded": streets_count > 0,
+        "total_streets": service.get_available_streets_count(),
     }
 
 
@@ -0,0 +1,49 @@
+"""
+Роутер векторных тайлов (Mapbox Vector Tile) для карты
+"""
+
+import asyncio
+
+import structlog
+from fastapi import APIRouter, Depends, HTTPException, Path, Response
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..services.vector_tile_service import (
+    MAX_ZOOM,
+    TILE_MEDIA_TYPE,
+    VectorTileService,
+    get_vector_tile_service,
+)
+
+logger = structlog.get_logger(__name__)
+router = APIRouter()
+
+
+@router.get(
+    "/{z}/{x}/{y}.mvt",
+    response_class=Response,
+    responses={200: {"content": {TILE_MEDIA_TYPE: {}}}},
+)
+async def get_vector_tile(
+    z: int = Path(..., ge=0, le=MAX_ZOOM, description="Масштаб"),
+    x: int = Path(..., ge=0, description="Номер тайла по X"),
+    y: int = Path(..., ge=0, description="Номер тайла по Y"),
+    db: Session = Depends(get_db),
+    service: VectorTileService = Depends(get_vector_tile_service),
+) -> Response:
+    """
+    Векторный тайл с улицами и активными ремонтными работами
+
+    Слои:
+    - **repair_works**: активные работы (линии участков и точки)
+    - **streets**: улицы из локальных данных (с масштаба 10)
+
+    Геометрия упрощается в зависимости от масштаба, тайлы кэшируются
+    в памяти и на диске.
+    """
+    if x >= 2**z or y >= 2**z:
+        raise HTTPException(status_code=404, detail="Тайл вне диапазона")
+
+    tile = await asyncio.to_thread(service.get_tile, db, z, x, y)
+    return Response(content=tile, media_type=TILE_MEDIA_TYPE)
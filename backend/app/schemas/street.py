@@ -2,6 +2,8 @@
 Pydantic схемы для работы с улицами и геолокацией
 """
 
+from enum import Enum
+
 from pydantic import BaseModel, Field, field_validator
 
 
@@ -133,6 +135,100 @@ class StreetGeometry(BaseModel):
         }
 
 
+class GeometryFormat(str, Enum):
+    """Формат передачи сегментов улицы"""
+
+    JSON = "json"  # Вложенные массивы [[lat, lon], ...]
+    POLYLINE = "polyline"  # Google Encoded Polyline
+    QUANTIZED = "quantized"  # Разности целочисленных координат
+
+
+class EncodedStreetGeometry(BaseModel):
+    """Геометрия улицы с сегментами в компактном формате"""
+
+    segments: list[str] | list[list[int]] = Field(
+        ...,
+        description=(
+            "Сегменты улицы: строки Encoded Polyline (polyline) или плоские "
+            "массивы [lat0, lon0, dlat1, dlon1, ...] (quantized)"
+        ),
+    )
+    format: GeometryFormat = Field(..., description="Формат сегментов")
+    precision: int = Field(
+        ..., description="Количество знаков после запятой в координатах"
+    )
+    name: str = Field(..., description="Название улицы")
+    osm_type: str = Field(..., description="Тип объекта в OSM")
+    osm_id: int = Field(..., description="ID объекта в OSM")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "segments": ["wpjj~A_oibdAg^od@"],
+                "format": "polyline",
+                "precision": 6,
+                "name": "Сумська вулиця",
+                "osm_type": "way",
+                "osm_id": 789012,
+            }
+        }
+
+
+# Максимальное количество улиц в одном пакетном запросе геометрии
+STREET_GEOMETRY_BATCH_LIMIT = 100
+
+
+class StreetGeometryBatchRequest(BaseModel):
+    """Пакетный запрос геометрии нескольких улиц"""
+
+    street_keys: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=STREET_GEOMETRY_BATCH_LIMIT,
+        description="Ключи (или названия) улиц; повторы обрабатываются один раз",
+    )
+    fuzzy_threshold: int = Field(
+        70, ge=50, le=100, description="Минимальный порог схожести для fuzzy matching"
+    )
+    zoom: int | None = Field(
+        None, ge=0, le=22, description="Масштаб карты для упрощения геометрии"
+    )
+    tolerance: float | None = Field(
+        None, ge=0, description="Допуск упрощения геометрии в метрах"
+    )
+    format: GeometryFormat = Field(GeometryFormat.JSON, description="Формат сегментов")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "street_keys": ["сумська вулиця", "проспект науки"],
+                "format": "polyline",
+            }
+        }
+
+
+class StreetGeometryBatchItem(BaseModel):
+    """Результат пакетного запроса для одной улицы"""
+
+    query: str = Field(..., description="Ключ или название улицы из запроса")
+    street_key: str | None = Field(None, description="Найденный ключ улицы")
+    status: str = Field(
+        ...,
+        description="found или not_found (улица не найдена или у нее нет сегментов)",
+    )
+    geometry: StreetGeometry | EncodedStreetGeometry | None = Field(
+        None, description="Геометрия улицы (None, если улица не найдена)"
+    )
+
+
+class StreetGeometryBatchResponse(BaseModel):
+    """Ответ пакетного запроса геометрии улиц"""
+
+    results: list[StreetGeometryBatchItem] = Field(
+        ..., description="Результаты в порядке первого появления в запросе"
+    )
+
+
 class ReverseGeocodeResult(BaseModel):
     """Результат обратного геокодирования"""
 
@@ -142,6 +238,14 @@ class ReverseGeocodeResult(BaseModel):
     suburb: str | None = Field(None, description="Район")
     city: str | None = Field(None, description="Город")
     postcode: str | None = Field(None, description="Почтовый индекс")
+    street_key: str | None = Field(None, description="Ключ улицы в локальных данных")
+    distance_meters: float | None = Field(
+        None, description="Расстояние от точки до улицы в метрах (локальный режим)"
+    )
+    snapped_point: dict | None = Field(
+        None, description="Ближайшая к точке точка улицы {lat, lon} (локальный режим)"
+    )
+    source: str = Field("nominatim", description="Источник: local или nominatim")
 
     class Config:
         json_schema_extra = {
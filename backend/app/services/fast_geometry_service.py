@@ -2,69 +2,243 @@
 Быстрый сервис для получения геометрии улиц из локального JSON файла
 """
 
+import asyncio
+import hashlib
 import json
+import os
+import sys
+import threading
+import time
 from pathlib import Path
+from typing import NamedTuple
 
+import numpy as np
+import shapely
 import structlog
-from fuzzywuzzy import fuzz, process
+from rapidfuzz import fuzz, process
+from shapely.geometry import LineString, MultiLineString
+from shapely.ops import linemerge
 
-from ..schemas.street import StreetGeometry
+from ..config import get_settings
+from ..schemas.street import GeometryFormat, StreetGeometry
+from ..utils.compression import MIN_COMPRESS_SIZE, SUPPORTED_ENCODINGS, compress
+from ..utils.geometry_encoding import (
+    GEOMETRY_PRECISION,
+    encode_polyline,
+    encode_quantized,
+)
+from ..utils.lru_cache import LRUCache
+from ..utils.street_names import has_latin, search_tokens, street_name_variants
+from .street_geometry_store import (
+    STORE_VERSION,
+    GeometryStore,
+    StreetLocation,
+    open_geometry_store,
+    source_signature,
+    store_path_for,
+)
+from .street_search_index import (
+    StreetSearchIndex,
+    StreetTrigramIndex,
+    build_alias_index,
+    latin_tokenize,
+)
+from .street_spatial_index import SegmentHit, StreetSpatialIndex
 
 logger = structlog.get_logger(__name__)
+settings = get_settings()
+
+# Путь к полному JSON файлу с геометрией улиц
+STREETS_FULL_DATA_PATH = (
+    Path(__file__).parent.parent.parent.parent
+    / "frontend"
+    / "static"
+    / "data"
+    / "kharkiv_streets_full.json"
+)
+
+# Параметры отбора кандидатов для нечеткого поиска улицы
+FUZZY_CANDIDATES_LIMIT = 50
+FUZZY_CANDIDATES_MIN_SCORE = 0.2
+
+# Количество кандидатов по префиксу, переранжируемых с учетом популярности
+POPULARITY_CANDIDATES_LIMIT = 50
+# Сколько самых популярных улиц дополнительно проверяется на совпадение
+POPULAR_STREETS_LIMIT = 500
+
+# Размер пикселя Web Mercator на экваторе при zoom 0 (метры) и широта Харькова
+WEB_MERCATOR_METERS_PER_PIXEL = 156_543.03392
+KHARKIV_LATITUDE = 49.99
+
+
+def tolerance_for_zoom(zoom: int, latitude: float = KHARKIV_LATITUDE) -> float:
+    """
+    Допуск упрощения геометрии для масштаба карты
+
+    Отклонения меньше одного пикселя на экране не видны, поэтому допуск
+    равен размеру пикселя в метрах на заданной широте.
+
+    Args:
+        zoom: Масштаб карты (0-22)
+        latitude: Широта, для которой вычисляется размер пикселя
+
+    Returns:
+        Допуск в метрах
+    """
+    return WEB_MERCATOR_METERS_PER_PIXEL * np.cos(np.radians(latitude)) / 2**zoom
+
+
+class MergedStreetGeometry(NamedTuple):
+    """Слитая (linemerge) геометрия улицы в осях [lon, lat] для вычисления сегментов"""
+
+    # Части улицы после слияния сегментов (массив подготовленных LineString)
+    parts: np.ndarray
+    # Ограничивающие прямоугольники частей (k, 4): minx, miny, maxx, maxy
+    part_bounds: np.ndarray
+    # Ограничивающий прямоугольник всей улицы
+    bounds: tuple[float, float, float, float]
 
 
 class FastGeometryService:
     """Сервис для быстрого получения геометрии улиц из локального кэша"""
 
     def __init__(self):
-        self.streets_data: dict[str, list[dict]] = {}
+        # Каталог улиц: ключ -> {name, segments_count}
+        self.streets_data: dict[str, dict] = {}
+        # Бинарное хранилище координат (mmap) и индекс смещений ключ -> диапазон байт
+        self._store: GeometryStore | None = None
+        self._street_offsets: dict[str, StreetLocation] = {}
+        # Слитые и подготовленные геометрии Shapely для /segment-local
+        self._merged_streets = LRUCache(settings.street_geometry_cache_size)
+        # Результаты нечеткого поиска: (название, порог) -> ключ улицы или None
+        self._resolved_names = LRUCache(settings.street_name_resolution_cache_size)
+        # Готовые тела ответов /fast-geometry: (ключ, уровень, формат) -> JSON байты,
+        # ограничены суммарным размером
+        self._serialized_geometries = LRUCache(
+            settings.street_geometry_cache_size,
+            max_bytes=settings.street_serialized_cache_mb * 1024 * 1024,
+        )
+        # Сжатые (gzip, brotli) тела ответов, ограничены суммарным размером
+        self._compressed_geometries = LRUCache(
+            settings.street_geometry_cache_size * len(SUPPORTED_ENCODINGS),
+            max_bytes=settings.street_compressed_cache_mb * 1024 * 1024,
+        )
+        # Результаты автокомплита: (нормализованный запрос, лимит) -> номера улиц
+        self._search_results = LRUCache(settings.street_search_cache_size)
+        # Индекс начала слов для автокомплита и триграммный индекс для
+        # поиска по подстроке и с опечатками (общая нумерация улиц)
+        self._search_index = StreetSearchIndex([])
+        self._trigram_index = StreetTrigramIndex([])
+        # STRtree по всем сегментам для запросов "какая улица рядом с точкой"
+        self._spatial_index: StreetSpatialIndex | None = None
+        # Канонические формы названий (тип улицы, порядок слов, варианты букв)
+        self._aliases: dict[str, str] = {}
+        # Популярность улиц по истории ремонтных работ: номер улицы -> количество
+        self._popularity: dict[int, int] = {}
+        self._popular_ids: list[int] = []
+        # Исходная таблица популярности (переносится в новый индекс при перезагрузке)
+        self.street_name_counts: dict[str, int] = {}
+        # Версия исходного JSON файла (mtime_ns, размер), из которой построен индекс
+        self.data_signature: tuple[int, int] | None = None
+        # Охват координат набора данных (south, west, north, east)
+        self.data_bounds: tuple[float, float, float, float] | None = None
+        # Хэши версий набора данных и таблицы популярности (для ETag ответов);
+        # версия данных зависит только от содержимого, а не от файла на диске
+        self.data_version = ""
+        self.popularity_version = ""
         self.loaded = False
 
+    def load(self) -> "FastGeometryService":
+        """
+        Полностью загружает индекс улиц (каталог и геометрию)
+
+        После загрузки данные сервиса не изменяются, поэтому один экземпляр
+        можно безопасно использовать из всех запросов процесса.
+        """
+        self._load_streets_data()
+        return self
+
     def _load_streets_data(self):
-        """Загружает данные улиц из полного JSON файла"""
+        """
+        Открывает бинарное хранилище улиц и строит каталог названий
+
+        Хранилище собирается из полного JSON файла за один проход, если его
+        нет или оно собрано из другой версии JSON. Координаты не копируются в память процесса -
+        они читаются через mmap по требованию.
+        """
         if self.loaded:
             return
 
         try:
-            # Путь к полному JSON файлу
-            json_path = (
-                Path(__file__).parent.parent.parent.parent
-                / "frontend"
-                / "static"
-                / "data"
-                / "kharkiv_streets_full.json"
-            )
+            json_path = STREETS_FULL_DATA_PATH
 
-            if not json_path.exists():
+            if not json_path.exists() and not store_path_for(json_path).exists():
                 logger.error("Streets full data file not found", path=str(json_path))
                 return
 
-            with open(json_path, encoding="utf-8") as f:
-                full_data = json.load(f)
+            started_at = time.perf_counter()
+
+            store = open_geometry_store(json_path)
+            # Версия JSON, из которой собрано хранилище (зафиксирована до чтения
+            # файла, поэтому изменение во время сборки не будет пропущено)
+            data_signature = store.source_signature if json_path.exists() else None
 
-            # Преобразуем в упрощенный формат для поиска на лету
-            self.streets_data = {}
-            for street_key, segments_list in full_data.items():
-                if segments_list and len(segments_list) > 0:
-                    # Берем название из первого сегмента
-                    original_name = segments_list[0].get("name", street_key)
-                    self.streets_data[street_key] = {
-                        "name": original_name,
-                        "segments_count": len(segments_list),
-                    }
+            streets_data = {}
+            street_offsets = {}
+            for index, (street_key, original_name) in enumerate(
+                zip(store.keys, store.names, strict=True)
+            ):
+                streets_data[street_key] = {
+                    "name": original_name,
+                    "segments_count": store.segments_count(index),
+                }
+                street_offsets[street_key] = store.locate(index)
+
+            self._store = store
+            self.streets_data = streets_data
+            self._street_offsets = street_offsets
+            self._search_index = StreetSearchIndex(
+                [(key, data["name"]) for key, data in streets_data.items()]
+            )
+            self._trigram_index = StreetTrigramIndex(
+                list(
+                    zip(self._search_index.keys, self._search_index.names, strict=True)
+                )
+            )
+            self._aliases = build_alias_index(
+                self._search_index.keys, self._search_index.names
+            )
+            self._spatial_index = StreetSpatialIndex(store)
+            self.data_signature = data_signature
+            if len(store.coords):
+                south, west = store.coords.min(axis=0).tolist()
+                north, east = store.coords.max(axis=0).tolist()
+                self.data_bounds = (south, west, north, east)
+            self.data_version = hashlib.sha1(
+                repr((STORE_VERSION, settings.app_version, store.content_hash)).encode()
+            ).hexdigest()[:16]
+            self.loaded = True
 
             logger.info(
                 "Streets data loaded successfully",
                 streets_count=len(self.streets_data),
-                source="full_file_optimized",
+                aliases_count=len(self._aliases),
+                spatial_segments_count=len(self._spatial_index),
+                load_time_ms=round((time.perf_counter() - started_at) * 1000, 1),
+                rss_mb=_resident_memory_mb(),
+                peak_rss_mb=_peak_resident_memory_mb(),
+                source="binary_store",
             )
-            self.loaded = True
 
         except Exception as e:
             logger.error("Failed to load streets data", error=str(e))
 
     def find_street_geometry(
-        self, street_name: str, fuzzy_threshold: int = 70, street_key: str = None
+        self,
+        street_name: str,
+        fuzzy_threshold: int = 70,
+        street_key: str = None,
+        tolerance_m: float = 0.0,
     ) -> StreetGeometry | None:
         """
         Находит геометрию улицы по названию с fuzzy matching
@@ -72,10 +246,196 @@ class FastGeometryService:
         Args:
             street_name: Название улицы для поиска
             fuzzy_threshold: Минимальный порог схожести для fuzzy matching
+            street_key: Ключ улицы для прямого поиска
+            tolerance_m: Допустимое упрощение геометрии в метрах
+                (0 - полная геометрия)
 
         Returns:
             StreetGeometry или None если не найдена
         """
+        matched_key = self.find_street_key(street_name, fuzzy_threshold, street_key)
+        if matched_key is None:
+            return None
+
+        return self._create_street_geometry_from_new_format(
+            matched_key,
+            self.streets_data[matched_key],
+            self.geometry_level_for_tolerance(tolerance_m),
+        )
+
+    def street_geometry_json(
+        self,
+        street_key: str,
+        tolerance_m: float = 0.0,
+        geometry_format: GeometryFormat = GeometryFormat.JSON,
+    ) -> bytes:
+        """
+        Готовое JSON тело ответа /fast-geometry для найденной улицы
+
+        Ответ сериализуется один раз при первом запросе улицы прямо из
+        NumPy views хранилища (без промежуточной модели) и далее отдается из
+        LRU кэша, поэтому стоимость повторного запроса не зависит от
+        количества точек улицы.
+
+        Args:
+            street_key: Ключ улицы (результат find_street_key)
+            tolerance_m: Допустимое упрощение геометрии в метрах
+            geometry_format: Формат сегментов
+
+        Returns:
+            JSON StreetGeometry или EncodedStreetGeometry
+        """
+        level = self.geometry_level_for_tolerance(tolerance_m)
+        return self._serialized_geometries.get_or_create(
+            (street_key, level, geometry_format),
+            lambda: self._serialize_street_geometry(street_key, level, geometry_format),
+        )
+
+    def street_geometries_json(
+        self,
+        street_names: list[str],
+        fuzzy_threshold: int = 70,
+        tolerance_m: float = 0.0,
+        geometry_format: GeometryFormat = GeometryFormat.JSON,
+    ) -> bytes:
+        """
+        Готовое JSON тело ответа пакетного запроса геометрии улиц
+
+        Повторяющиеся значения запроса обрабатываются один раз, геометрии
+        берутся из кэша готовых ответов (street_geometry_json) и вставляются
+        в общий ответ без повторной сериализации.
+
+        Args:
+            street_names: Ключи или названия улиц
+            fuzzy_threshold: Минимальный порог схожести для fuzzy matching
+            tolerance_m: Допустимое упрощение геометрии в метрах
+            geometry_format: Формат сегментов
+
+        Returns:
+            JSON StreetGeometryBatchResponse
+        """
+        items = []
+        for query in dict.fromkeys(street_names):
+            street_key = self.find_street_key(query, fuzzy_threshold, query)
+            geometry = (
+                self.street_geometry_json(street_key, tolerance_m, geometry_format)
+                if street_key is not None
+                else b"null"
+            )
+            # Улица без сегментов для клиента равнозначна ненайденной
+            status = b'"not_found"' if geometry == b"null" else b'"found"'
+            items.append(
+                b'{"query":%s,"street_key":%s,"status":%s,"geometry":%s}'
+                % (
+                    _json_string(query),
+                    _json_string(street_key) if street_key is not None else b"null",
+                    status,
+                    geometry,
+                )
+            )
+
+        logger.info(
+            "Street geometries batch resolved",
+            requested=len(street_names),
+            unique=len(items),
+        )
+        return b'{"results":[' + b",".join(items) + b"]}"
+
+    def street_geometry_body(
+        self,
+        street_key: str,
+        tolerance_m: float = 0.0,
+        geometry_format: GeometryFormat = GeometryFormat.JSON,
+        encoding: str | None = None,
+    ) -> tuple[bytes, str | None]:
+        """
+        Тело ответа /fast-geometry в запрошенной кодировке сжатия
+
+        Сжатые варианты строятся при первом запросе и хранятся в LRU кэше с
+        ограничением суммарного размера; повторный запрос отдает готовые байты.
+        Небольшие ответы не сжимаются.
+
+        Args:
+            street_key: Ключ улицы (результат find_street_key)
+            tolerance_m: Допустимое упрощение геометрии в метрах
+            geometry_format: Формат сегментов
+            encoding: "br", "gzip" или None (без сжатия)
+
+        Returns:
+            Тело ответа и фактическая кодировка (None - без сжатия)
+        """
+        body = self.street_geometry_json(street_key, tolerance_m, geometry_format)
+        if encoding is None or len(body) < MIN_COMPRESS_SIZE:
+            return body, None
+
+        level = self.geometry_level_for_tolerance(tolerance_m)
+        compressed = self._compressed_geometries.get_or_create(
+            (street_key, level, geometry_format, encoding),
+            lambda: compress(body, encoding),
+        )
+        return compressed, encoding
+
+    def _serialize_street_geometry(
+        self, street_key: str, level: int, geometry_format: GeometryFormat
+    ) -> bytes:
+        """
+        Сериализует геометрию улицы в JSON тело ответа
+
+        Тело совпадает с model_dump_json() StreetGeometry и
+        EncodedStreetGeometry, но сегменты не копируются в модель.
+        """
+        segments = self._street_segments(street_key, level)
+        if not segments:
+            return b"null"
+
+        name = _json_string(self.streets_data[street_key]["name"])
+        if geometry_format != GeometryFormat.JSON:
+            encode = (
+                encode_polyline
+                if geometry_format == GeometryFormat.POLYLINE
+                else encode_quantized
+            )
+            encoded = json.dumps(
+                [encode(segment) for segment in segments if len(segment)],
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode("utf-8")
+            return (
+                b'{"segments":%s,"format":"%s","precision":%d,"name":%s,'
+                b'"osm_type":"way","osm_id":0}'
+                % (encoded, geometry_format.value.encode(), GEOMETRY_PRECISION, name)
+            )
+
+        coordinates = b",".join(
+            json.dumps(segment.tolist(), separators=(",", ":")).encode()
+            for segment in segments
+        )
+        return (
+            b'{"coordinates":[],"segments":[%s],"name":%s,'
+            b'"osm_type":"way","osm_id":0}' % (coordinates, name)
+        )
+
+    def geometry_level_for_tolerance(self, tolerance_m: float) -> int:
+        """Уровень детализации хранилища для допуска упрощения (0 - полный)"""
+        self._load_streets_data()
+        if self._store is None or tolerance_m <= 0:
+            return 0
+        return self._store.level_for_tolerance(tolerance_m)
+
+    def find_street_key(
+        self, street_name: str, fuzzy_threshold: int = 70, street_key: str = None
+    ) -> str | None:
+        """
+        Определяет ключ улицы в индексе по названию с fuzzy matching
+
+        Args:
+            street_name: Название улицы для поиска
+            fuzzy_threshold: Минимальный порог схожести для fuzzy matching
+            street_key: Ключ улицы для прямого поиска
+
+        Returns:
+            Ключ улицы или None если не найдена
+        """
         self._load_streets_data()
 
         if not self.streets_data:
@@ -92,9 +452,7 @@ class FastGeometryService:
         # Если передан ключ, используем его напрямую
         if street_key and street_key in self.streets_data:
             logger.info("Direct key match found", street_key=street_key)
-            return self._create_street_geometry_from_new_format(
-                street_key, self.streets_data[street_key]
-            )
+            return street_key
 
         # Нормализуем название для поиска
         normalized_street_name = street_name.lower().strip()
@@ -108,45 +466,153 @@ class FastGeometryService:
         # Сначала пытаемся точное совпадение по нормализованному названию
         if normalized_street_name in self.streets_data:
             logger.info("Exact match found", street_name=street_name)
-            return self._create_street_geometry_from_new_format(
-                normalized_street_name, self.streets_data[normalized_street_name]
-            )
+            return normalized_street_name
 
-        # Показываем несколько похожих названий для отладки
-        street_names = list(self.streets_data.keys())
-        similar_names = [name for name in street_names if "ландау" in name.lower()]
-        logger.info(
-            "Similar street names with 'ландау'", similar_names=similar_names[:10]
-        )
+        # Затем по канонической форме ("вул. Сумська" == "Сумська вулиця")
+        for form in street_name_variants(street_name):
+            alias_key = self._aliases.get(form)
+            if alias_key:
+                logger.info("Alias match found", street_name=street_name, key=alias_key)
+                return alias_key
 
         # Если точного совпадения нет, используем fuzzy matching
-        matches = process.extract(
-            normalized_street_name, street_names, limit=3, scorer=fuzz.ratio
+        return self._resolved_names.get_or_create(
+            (normalized_street_name, fuzzy_threshold),
+            lambda: self._fuzzy_find_street_key(
+                normalized_street_name, fuzzy_threshold
+            ),
+        )
+
+    def _fuzzy_find_street_key(
+        self, normalized_street_name: str, fuzzy_threshold: int
+    ) -> str | None:
+        """
+        Нечеткий поиск ключа улицы среди кандидатов из триграммного индекса
+
+        Полный перебор всех названий заменен двумя шагами: триграммный индекс
+        отбирает небольшое число кандидатов, а затем только они оцениваются
+        C-реализацией fuzz.ratio из rapidfuzz. Улицы с той же долей триграмм,
+        что у последнего кандидата, тоже оцениваются - иначе лучшее совпадение
+        могло бы отсечься рангом названия (в худшем случае это полный перебор,
+        как раньше; результат кэшируется).
+
+        Args:
+            normalized_street_name: Название улицы в нижнем регистре
+            fuzzy_threshold: Минимальный порог схожести (0-100)
+
+        Returns:
+            Ключ улицы или None если совпадение ниже порога
+        """
+        candidate_ids = self._trigram_index.search(
+            normalized_street_name,
+            limit=FUZZY_CANDIDATES_LIMIT,
+            min_score=FUZZY_CANDIDATES_MIN_SCORE,
+            include_ties=True,
         )
-        logger.info("Top fuzzy matches", matches=matches)
+        candidate_keys = [
+            self._search_index.keys[street_id] for street_id, _score in candidate_ids
+        ]
 
-        if matches and matches[0][1] >= fuzzy_threshold:
-            best_match = matches[0][0]
+        # Запрос латиницей сравниваем с транслитерацией ключей
+        if has_latin(normalized_street_name):
+            query = " ".join(search_tokens(normalized_street_name))
+            choices = {key: " ".join(latin_tokenize(key)) for key in candidate_keys}
+        else:
+            query = normalized_street_name
+            choices = {key: key for key in candidate_keys}
+
+        match = process.extractOne(
+            query,
+            choices,
+            scorer=fuzz.ratio,
+            score_cutoff=fuzzy_threshold,
+        )
+        logger.info(
+            "Fuzzy match candidates",
+            street_name=normalized_street_name,
+            candidates_count=len(candidate_keys),
+            match=match[:2] if match else None,
+        )
+
+        if match:
+            _, score, best_match = match
             logger.info(
                 "Fuzzy match found",
-                street_name=street_name,
+                street_name=normalized_street_name,
                 matched_name=best_match,
-                score=matches[0][1],
-            )
-            return self._create_street_geometry_from_new_format(
-                best_match, self.streets_data[best_match]
+                score=score,
             )
+            return best_match
 
         logger.warning(
             "No street match found",
-            street_name=street_name,
+            street_name=normalized_street_name,
             threshold=fuzzy_threshold,
-            best_match_score=matches[0][1] if matches else 0,
         )
         return None
 
+    def get_street_lines(self, street_key: str) -> list[np.ndarray]:
+        """
+        Возвращает сегменты улицы в порядке осей [lon, lat] (x, y для Shapely)
+
+        Это NumPy views на хранилище без копирования и без поточечной
+        обработки в Python - геометрия уже нормализована при сборке.
+
+        Args:
+            street_key: Ключ улицы в индексе
+
+        Returns:
+            Список массивов формы (n, 2) с координатами [lon, lat]
+        """
+        self._load_streets_data()
+
+        location = self._street_offsets.get(street_key)
+        if location is None:
+            return []
+
+        return [
+            segment[:, ::-1] for segment in self._store.street_segments(location.index)
+        ]
+
+    def get_merged_street(self, street_key: str) -> MergedStreetGeometry | None:
+        """
+        Возвращает слитую геометрию улицы из кэша, строя ее при первом обращении
+
+        Args:
+            street_key: Ключ улицы в индексе
+
+        Returns:
+            MergedStreetGeometry или None если у улицы нет линий
+        """
+        return self._merged_streets.get_or_create(
+            street_key, lambda: self._build_merged_street(street_key)
+        )
+
+    def _build_merged_street(self, street_key: str) -> MergedStreetGeometry | None:
+        """Сливает сегменты улицы в линии и подготавливает их для запросов"""
+        lines = [line for line in self.get_street_lines(street_key) if len(line) >= 2]
+        if not lines:
+            return None
+
+        merged = linemerge(MultiLineString([LineString(line) for line in lines]))
+        parts = np.array(
+            list(merged.geoms) if merged.geom_type == "MultiLineString" else [merged],
+            dtype=object,
+        )
+        # Подготовленные геометрии ускоряют повторные пространственные запросы
+        shapely.prepare(parts)
+
+        part_bounds = shapely.bounds(parts)
+        bounds = (
+            float(part_bounds[:, 0].min()),
+            float(part_bounds[:, 1].min()),
+            float(part_bounds[:, 2].max()),
+            float(part_bounds[:, 3].max()),
+        )
+        return MergedStreetGeometry(parts=parts, part_bounds=part_bounds, bounds=bounds)
+
     def _create_street_geometry_from_new_format(
-        self, street_name: str, street_data: dict
+        self, street_name: str, street_data: dict, level: int = 0
     ) -> StreetGeometry:
         """
         Создает объект StreetGeometry из полного файла
@@ -155,12 +621,14 @@ class FastGeometryService:
         Args:
             street_name: Название улицы (нормализованный ключ)
             street_data: Данные улицы {name, segments_count}
+            level: Уровень детализации геометрии (0 - полная)
 
         Returns:
             StreetGeometry объект с массивом сегментов
         """
-        # Получаем все сегменты улицы из кэшированных данных
-        all_segments = self._get_all_street_segments_cached(street_name)
+        all_segments = [
+            segment.tolist() for segment in self._street_segments(street_name, level)
+        ]
 
         if not all_segments:
             logger.warning("No segments found for street", street_name=street_name)
@@ -173,6 +641,7 @@ class FastGeometryService:
             street_name=original_name,
             segments_count=len(all_segments),
             total_points=sum(len(seg) for seg in all_segments),
+            level=level,
         )
 
         # Создаем объект с сегментами
@@ -188,76 +657,27 @@ class FastGeometryService:
 
         return geometry
 
-    def _get_all_street_segments_cached(
-        self, street_name: str
-    ) -> list[list[list[float]]]:
+    def _street_segments(self, street_name: str, level: int = 0) -> list[np.ndarray]:
         """
-        Получает все сегменты улицы из кэшированных данных
+        Сегменты улицы как NumPy views на хранилище (без копирования)
+
+        Читаются только страницы файла с координатами запрошенной улицы.
 
         Args:
             street_name: Название улицы (нормализованный ключ)
+            level: Уровень детализации геометрии (0 - полная)
 
         Returns:
-            Список сегментов, где каждый сегмент - это список координат [[lon, lat], ...]
+            Список массивов формы (n, 2) с координатами [lat, lon]
         """
-        try:
-            # Загружаем полные данные в память при первом обращении
-            if not hasattr(self, "_full_data"):
-                self._load_full_data()
-
-            # Пробуем найти улицу по нормализованному ключу
-            if street_name in self._full_data:
-                segments_data = self._full_data[street_name]
-                segments = []
-
-                for segment_info in segments_data:
-                    coordinates = segment_info.get("coordinates", [])
-                    if coordinates:
-                        segments.append(coordinates)
-
-                return segments
-            else:
-                logger.warning(
-                    "Street not found in cached full data", street_name=street_name
-                )
-                return []
+        self._load_streets_data()
 
-        except Exception as e:
-            logger.error(
-                "Failed to get segments from cache",
-                street_name=street_name,
-                error=str(e),
-            )
+        location = self._street_offsets.get(street_name)
+        if location is None:
+            logger.warning("Street not found in segment store", street_name=street_name)
             return []
 
-    def _load_full_data(self):
-        """Загружает полные данные в память для быстрого доступа"""
-        try:
-            full_json_path = (
-                Path(__file__).parent.parent.parent.parent
-                / "frontend"
-                / "static"
-                / "data"
-                / "kharkiv_streets_full.json"
-            )
-
-            if not full_json_path.exists():
-                logger.error(
-                    "Full streets data file not found", path=str(full_json_path)
-                )
-                self._full_data = {}
-                return
-
-            with open(full_json_path, encoding="utf-8") as f:
-                self._full_data = json.load(f)
-
-            logger.info(
-                "Full data loaded into memory", total_streets=len(self._full_data)
-            )
-
-        except Exception as e:
-            logger.error("Failed to load full data", error=str(e))
-            self._full_data = {}
+        return self._store.street_segments(location.index, level)
 
     def _create_street_geometry(
         self, street_name: str, points_data: list[dict]
@@ -296,9 +716,100 @@ class FastGeometryService:
         self._load_streets_data()
         return len(self.streets_data)
 
+    def _lookup_street_key(self, street_name: str) -> str | None:
+        """Ключ улицы по точному названию или канонической форме (без fuzzy)"""
+        normalized_street_name = street_name.lower().strip()
+        if normalized_street_name in self.streets_data:
+            return normalized_street_name
+        for form in street_name_variants(street_name):
+            alias_key = self._aliases.get(form)
+            if alias_key:
+                return alias_key
+        return None
+
+    def apply_street_popularity(self, street_name_counts: dict[str, int]) -> None:
+        """
+        Обновляет таблицу популярности улиц для ранжирования автокомплита
+
+        Args:
+            street_name_counts: Количество ремонтных работ по названию улицы
+        """
+        self._load_streets_data()
+
+        index = self._search_index
+        street_ids = {key: street_id for street_id, key in enumerate(index.keys)}
+        popularity: dict[int, int] = {}
+        for street_name, count in street_name_counts.items():
+            street_id = street_ids.get(self._lookup_street_key(street_name) or "")
+            if street_id is not None:
+                # Работы учитываются у улицы, которую для этого названия
+                # показывает автокомплит
+                street_id = index.name_ids[street_id]
+                popularity[street_id] = popularity.get(street_id, 0) + count
+
+        self.street_name_counts = street_name_counts
+        popularity_version = hashlib.sha1(
+            repr(sorted(popularity.items())).encode()
+        ).hexdigest()[:16]
+        # Без изменений в популярности кэш автокомплита остается актуальным
+        if popularity_version == self.popularity_version:
+            return
+
+        # Таблицы заменяются целиком до смены версии, а версия входит в ключ
+        # кэша автокомплита: поиск, начатый до замены, не сохранит результат
+        # старого ранжирования под ключом новой версии. Очистка лишь
+        # освобождает записи прежней версии
+        self._popular_ids = sorted(
+            popularity, key=popularity.__getitem__, reverse=True
+        )[:POPULAR_STREETS_LIMIT]
+        self._popularity = popularity
+        self.popularity_version = popularity_version
+        self._search_results.clear()
+
+        logger.info(
+            "Street popularity updated",
+            street_names=len(street_name_counts),
+            matched_streets=len(popularity),
+        )
+
+    def _rank_by_popularity(
+        self, query: str, street_ids: list[int], limit: int
+    ) -> list[int]:
+        """
+        Переранжирует кандидатов автокомплита с учетом популярности улиц
+
+        К кандидатам по рангу названия добавляются популярные улицы,
+        подходящие под запрос. Итоговая оценка - позиция по рангу (с 1),
+        деленная на (1 + количество работ) ** street_popularity_weight.
+        """
+        popularity = self._popularity
+        query_tokens = search_tokens(query)
+
+        candidates = set(street_ids)
+        for street_id in self._popular_ids:
+            if street_id not in candidates and self._search_index.matches(
+                street_id, query_tokens
+            ):
+                candidates.add(street_id)
+
+        weight = settings.street_popularity_weight
+        scores = {
+            street_id: (position + 1) / (1 + popularity.get(street_id, 0)) ** weight
+            for position, street_id in enumerate(sorted(candidates))
+        }
+        return sorted(scores, key=lambda street_id: (scores[street_id], street_id))[
+            :limit
+        ]
+
     def search_streets_by_prefix(self, prefix: str, limit: int = 10) -> list[dict]:
         """
-        Поиск улиц по префиксу для автокомплита
+        Поиск улиц по началу слов названия для автокомплита
+
+        Порядок определяется рангом названия (короче - выше) с поправкой на
+        популярность улицы в истории ремонтных работ. Результаты кэшируются
+        по нормализованному запросу, лимиту и версии популярности; кэш
+        принадлежит экземпляру сервиса и пропадает вместе с ним при
+        перезагрузке данных.
 
         Args:
             prefix: Префикс для поиска
@@ -312,25 +823,272 @@ class FastGeometryService:
         if not self.streets_data:
             return []
 
-        prefix_lower = prefix.lower()
-        matches = []
-        seen_names = set()  # Для избежания дубликатов
-
-        for street_key, street_data in self.streets_data.items():
-            if prefix_lower in street_key:
-                # Возвращаем оригинальное название из данных, а не ключ
-                original_name = street_data.get("name", street_key)
-
-                # Добавляем только если еще не видели это название
-                if original_name not in seen_names:
-                    matches.append(
-                        {
-                            "name": original_name,
-                            "key": street_key,  # Сохраняем ключ для поиска геометрии
-                        }
-                    )
-                    seen_names.add(original_name)
-
-        # Сортируем по длине названия (более короткие названия сначала)
-        matches.sort(key=lambda x: len(x["name"]))
-        return matches[:limit]
+        index = self._search_index
+        street_ids = self._search_results.get_or_create(
+            (" ".join(search_tokens(prefix)), limit, self.popularity_version),
+            lambda: self._search_street_ids(prefix, limit),
+        )
+
+        return [
+            {"name": index.names[street_id], "key": index.keys[street_id]}
+            for street_id in street_ids
+        ]
+
+    def _search_street_ids(self, prefix: str, limit: int) -> tuple[int, ...]:
+        """Номера улиц для автокомплита в порядке выдачи (без кэша)"""
+        index = self._search_index
+        if self._popularity:
+            street_ids = self._rank_by_popularity(
+                prefix,
+                index.search(prefix, max(limit, POPULARITY_CANDIDATES_LIMIT)),
+                limit,
+            )
+        else:
+            street_ids = index.search(prefix, limit)
+
+        # Недостающие результаты добираем поиском по подстроке и с опечатками
+        if len(street_ids) < limit:
+            seen_ids = set(street_ids)
+            for street_id, _score in self._trigram_index.search(prefix, limit):
+                street_id = index.name_ids[street_id]
+                if street_id not in seen_ids:
+                    street_ids.append(street_id)
+                    seen_ids.add(street_id)
+
+        return tuple(street_ids[:limit])
+
+    def _segment_hit_to_dict(self, hit: SegmentHit) -> dict:
+        street_key = self._store.keys[hit.street_index]
+        return {
+            "key": street_key,
+            "name": self.streets_data[street_key]["name"],
+            "segment_index": hit.segment_index,
+            "distance_meters": round(hit.distance_m, 2),
+            "point": {"lat": hit.lat, "lon": hit.lon},
+        }
+
+    def find_nearest_street(
+        self, lat: float, lon: float, max_distance_m: float | None = None
+    ) -> dict | None:
+        """
+        Ближайшая к точке улица (поиск по STRtree, O(log n))
+
+        Args:
+            lat, lon: Координаты точки
+            max_distance_m: Максимальное расстояние до улицы (метры)
+
+        Returns:
+            {"key", "name", "segment_index", "distance_meters", "point"} или None
+        """
+        self._load_streets_data()
+
+        if self._spatial_index is None:
+            return None
+
+        hit = self._spatial_index.nearest(lat, lon, max_distance_m)
+        return self._segment_hit_to_dict(hit) if hit else None
+
+    def find_streets_within(
+        self, lat: float, lon: float, distance_m: float, limit: int = 10
+    ) -> list[dict]:
+        """
+        Улицы в пределах расстояния от точки, ближайшие первыми
+
+        Для каждой улицы возвращается ее ближайший к точке сегмент.
+
+        Args:
+            lat, lon: Координаты точки
+            distance_m: Радиус поиска (метры)
+            limit: Максимальное количество улиц
+
+        Returns:
+            Список словарей как в find_nearest_street
+        """
+        self._load_streets_data()
+
+        if self._spatial_index is None:
+            return []
+
+        results = []
+        seen_streets = set()
+        for hit in self._spatial_index.within(lat, lon, distance_m):
+            if hit.street_index in seen_streets:
+                continue
+            seen_streets.add(hit.street_index)
+            results.append(self._segment_hit_to_dict(hit))
+            if len(results) >= limit:
+                break
+        return results
+
+    def street_segments_in_bounds(
+        self,
+        south: float,
+        west: float,
+        north: float,
+        east: float,
+        tolerance_m: float = 0.0,
+    ) -> tuple[list[str], np.ndarray, np.ndarray]:
+        """
+        Сегменты улиц, попадающие в прямоугольник (для векторных тайлов)
+
+        Args:
+            south, west, north, east: Границы прямоугольника (градусы)
+            tolerance_m: Допустимое упрощение геометрии в метрах
+
+        Returns:
+            Ключи улиц по сегментам, координаты точек [lat, lon] всех
+            сегментов подряд и количество точек в каждом сегменте
+        """
+        self._load_streets_data()
+
+        if self._spatial_index is None:
+            return [], np.empty((0, 2)), np.empty(0, dtype=np.int64)
+
+        street_ids, segment_ids = self._spatial_index.segments_in_bounds(
+            south, west, north, east
+        )
+        level = self._store.levels[self.geometry_level_for_tolerance(tolerance_m)]
+        starts = level.segment_offsets[segment_ids].astype(np.int64)
+        lengths = level.segment_offsets[segment_ids + 1].astype(np.int64) - starts
+
+        # Индексы точек всех сегментов подряд
+        first_positions = np.cumsum(lengths) - lengths
+        point_index = np.repeat(starts - first_positions, lengths) + np.arange(
+            int(lengths.sum())
+        )
+        keys = [self._store.keys[street_index] for street_index in street_ids.tolist()]
+        return keys, level.coords[point_index], lengths
+
+    def cache_stats(self) -> dict[str, dict]:
+        """Статистика LRU кэшей сервиса для мониторинга"""
+        return {
+            "merged_streets": self._merged_streets.stats(),
+            "resolved_names": self._resolved_names.stats(),
+            "search_results": self._search_results.stats(),
+            "serialized_geometries": self._serialized_geometries.stats(),
+            "compressed_geometries": self._compressed_geometries.stats(),
+        }
+
+
+def _json_string(value: str) -> bytes:
+    """Строка в виде JSON байтов"""
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def _resident_memory_mb() -> float | None:
+    """Возвращает текущий объем резидентной памяти процесса (МБ), если доступен"""
+    try:
+        # Linux: второе поле statm - резидентные страницы
+        with open("/proc/self/statm", encoding="ascii") as f:
+            resident_pages = int(f.read().split()[1])
+        return round(resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024, 1)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return _peak_resident_memory_mb()
+
+
+def _peak_resident_memory_mb() -> float | None:
+    """Возвращает пиковый объем резидентной памяти процесса (МБ), если доступен"""
+    try:
+        import resource
+
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # На macOS ru_maxrss в байтах, на Linux - в килобайтах
+        divider = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return round(max_rss / divider, 1)
+    except (ImportError, OSError):
+        # Windows: модуль resource недоступен
+        return None
+
+
+def street_data_signature() -> tuple[int, int] | None:
+    """Версия JSON файла улиц (mtime_ns, размер) или None, если файла нет"""
+    return source_signature(STREETS_FULL_DATA_PATH)
+
+
+# Общий для процесса индекс улиц (создается один раз в lifespan приложения)
+_fast_geometry_service: FastGeometryService | None = None
+# Перезагрузки выполняются по одной, чтобы не собирать индекс дважды
+_reload_lock = threading.Lock()
+
+
+def init_fast_geometry_service() -> FastGeometryService:
+    """Строит индекс улиц и делает его общим для всех запросов процесса"""
+    global _fast_geometry_service
+    _fast_geometry_service = FastGeometryService().load()
+    return _fast_geometry_service
+
+
+def reload_fast_geometry_service() -> FastGeometryService:
+    """
+    Строит новый индекс улиц и атомарно подменяет им текущий
+
+    Новый экземпляр полностью собирается до подмены, поэтому запросы,
+    уже получившие старый экземпляр через Depends, дорабатывают на нем
+    (его mmap остается открытым, пока на него есть ссылки), а новые запросы
+    сразу получают новый. Таблица популярности переносится из старого индекса.
+
+    Returns:
+        Новый индекс улиц
+
+    Raises:
+        RuntimeError: Если данные не удалось загрузить (текущий индекс сохраняется)
+    """
+    global _fast_geometry_service
+
+    with _reload_lock:
+        started_at = time.perf_counter()
+        previous = _fast_geometry_service
+
+        service = FastGeometryService().load()
+        if not service.loaded:
+            raise RuntimeError("Failed to load street dataset")
+        if previous is not None and previous.street_name_counts:
+            service.apply_street_popularity(previous.street_name_counts)
+
+        _fast_geometry_service = service
+
+    logger.info(
+        "Street index reloaded",
+        streets_count=service.get_available_streets_count(),
+        previous_streets_count=(
+            previous.get_available_streets_count() if previous else None
+        ),
+        reload_time_ms=round((time.perf_counter() - started_at) * 1000, 1),
+    )
+    return service
+
+
+async def run_street_data_watch(interval_seconds: int) -> None:
+    """
+    Следит за изменением JSON файла улиц и перезагружает индекс
+
+    Сравнивает mtime и размер файла с версией текущего индекса; сборка
+    выполняется в отдельном потоке, event loop не блокируется.
+
+    Args:
+        interval_seconds: Интервал проверки файла
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        signature = street_data_signature()
+        current = _fast_geometry_service
+        if signature is None or (current and current.data_signature == signature):
+            continue
+
+        logger.info("Street dataset changed on disk", path=str(STREETS_FULL_DATA_PATH))
+        try:
+            await asyncio.to_thread(reload_fast_geometry_service)
+        except Exception as e:
+            logger.error("Street index reload failed", error=str(e))
+
+
+def get_fast_geometry_service() -> FastGeometryService:
+    """
+    Dependency для получения общего индекса улиц
+
+    Если приложение запущено без lifespan (например, в скриптах),
+    индекс строится при первом обращении.
+    """
+    if _fast_geometry_service is None:
+        return init_fast_geometry_service()
+    return _fast_geometry_service
@@ -0,0 +1,269 @@
+"""
+Сборка набора данных улиц из локальной выгрузки OpenStreetMap
+
+Источники:
+    * Overpass JSON (``[out:json]``): ways с ``nodes`` + отдельные nodes,
+      либо ways с ``out geom`` (поле ``geometry``);
+    * ``.osm.pbf`` - требует необязательный пакет ``osmium`` (pyosmium).
+
+Линии дорог (``highway=*`` из STREET_HIGHWAY_TYPES) с названием
+группируются по канонической форме названия, сегменты каждой улицы
+склеиваются (linemerge) в пуле процессов. Результат - тот же
+``kharkiv_streets_full.json``, что использует приложение, и бинарное
+хранилище рядом с ним. Вывод детерминирован: при одинаковом входе
+файлы совпадают побайтно.
+"""
+
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import structlog
+from shapely.geometry import LineString, MultiLineString
+from shapely.ops import linemerge
+
+from ..utils.street_names import canonical_street_name
+from .street_geometry_store import build_geometry_store, store_path_for
+
+logger = structlog.get_logger(__name__)
+
+# Типы дорог, которые считаются улицами
+STREET_HIGHWAY_TYPES = frozenset(
+    {
+        "motorway",
+        "trunk",
+        "primary",
+        "secondary",
+        "tertiary",
+        "unclassified",
+        "residential",
+        "living_street",
+        "pedestrian",
+        "road",
+        "service",
+        "motorway_link",
+        "trunk_link",
+        "primary_link",
+        "secondary_link",
+        "tertiary_link",
+    }
+)
+# Точность координат в выходном JSON (знаков после запятой, ~1 см)
+COORDINATE_PRECISION = 7
+# Количество улиц в одной задаче пула процессов
+ASSEMBLY_CHUNK_SIZE = 64
+
+# Линия улицы: (OSM id линии, название, координаты [[lat, lon], ...])
+StreetWay = tuple[int, str, list[list[float]]]
+
+
+def _street_way_name(tags: dict) -> str | None:
+    """Название улицы для линии OSM или None, если линия не является улицей"""
+    if tags.get("highway") not in STREET_HIGHWAY_TYPES:
+        return None
+    name = tags.get("name:uk") or tags.get("name")
+    return name.strip() if name and name.strip() else None
+
+
+def read_overpass_ways(path: Path) -> list[StreetWay]:
+    """
+    Читает линии улиц из Overpass JSON
+
+    Args:
+        path: Путь к файлу выгрузки
+
+    Returns:
+        Линии улиц с координатами в порядке [lat, lon]
+    """
+    with open(path, encoding="utf-8") as f:
+        elements = json.load(f).get("elements", [])
+
+    nodes = {
+        element["id"]: [element["lat"], element["lon"]]
+        for element in elements
+        if element.get("type") == "node" and "lat" in element
+    }
+
+    ways = []
+    for element in elements:
+        if element.get("type") != "way":
+            continue
+        name = _street_way_name(element.get("tags", {}))
+        if not name:
+            continue
+
+        if "geometry" in element:
+            coordinates = [
+                [point["lat"], point["lon"]]
+                for point in element["geometry"]
+                if point is not None
+            ]
+        else:
+            coordinates = [
+                nodes[node_id]
+                for node_id in element.get("nodes", [])
+                if node_id in nodes
+            ]
+        if len(coordinates) >= 2:
+            ways.append((element["id"], name, coordinates))
+    return ways
+
+
+def read_pbf_ways(path: Path) -> list[StreetWay]:
+    """
+    Читает линии улиц из .osm.pbf через pyosmium
+
+    Распаковка блоков PBF выполняется многопоточно внутри libosmium.
+
+    Args:
+        path: Путь к файлу выгрузки
+
+    Returns:
+        Линии улиц с координатами в порядке [lat, lon]
+
+    Raises:
+        RuntimeError: Если пакет osmium не установлен
+    """
+    try:
+        import osmium
+    except ImportError as e:
+        raise RuntimeError(
+            "Для чтения .osm.pbf установите пакет osmium: pip install osmium"
+        ) from e
+
+    ways: list[StreetWay] = []
+
+    class StreetWayHandler(osmium.SimpleHandler):
+        def way(self, way):
+            name = _street_way_name(dict(way.tags))
+            if not name:
+                return
+            coordinates = [
+                [node.location.lat, node.location.lon]
+                for node in way.nodes
+                if node.location.valid()
+            ]
+            if len(coordinates) >= 2:
+                ways.append((way.id, name, coordinates))
+
+    StreetWayHandler().apply_file(str(path), locations=True)
+    return ways
+
+
+def read_street_ways(path: Path) -> list[StreetWay]:
+    """Читает линии улиц из выгрузки, формат определяется по расширению"""
+    if path.name.endswith(".pbf"):
+        return read_pbf_ways(path)
+    return read_overpass_ways(path)
+
+
+def group_street_ways(ways: list[StreetWay]) -> dict[str, list[StreetWay]]:
+    """
+    Группирует линии по канонической форме названия
+
+    "вулиця Сумська" и "Сумська вулиця" попадают в одну улицу.
+
+    Returns:
+        Каноническая форма -> линии улицы, упорядоченные по OSM id
+    """
+    groups: dict[str, list[StreetWay]] = {}
+    for way in ways:
+        groups.setdefault(canonical_street_name(way[1]), []).append(way)
+    for group in groups.values():
+        group.sort(key=lambda way: way[0])
+    return groups
+
+
+def assemble_street(ways: list[StreetWay]) -> tuple[str, list[dict]]:
+    """
+    Собирает сегменты одной улицы
+
+    Смежные линии склеиваются через linemerge, координаты округляются.
+    Название улицы - самое частое написание среди ее линий.
+
+    Returns:
+        (название улицы, сегменты в формате kharkiv_streets_full.json)
+    """
+    name = Counter(way[1] for way in ways).most_common(1)[0][0]
+    merged = linemerge(MultiLineString([LineString(way[2]) for way in ways]))
+    lines = merged.geoms if isinstance(merged, MultiLineString) else [merged]
+
+    segments = [
+        {
+            "name": name,
+            "coordinates": [
+                [round(lat, COORDINATE_PRECISION), round(lon, COORDINATE_PRECISION)]
+                for lat, lon in line.coords
+            ],
+        }
+        for line in lines
+    ]
+    # Стабильный порядок сегментов независимо от результата linemerge
+    segments.sort(key=lambda segment: segment["coordinates"][0])
+    return name, segments
+
+
+def _assemble_streets_chunk(
+    groups: list[list[StreetWay]],
+) -> list[tuple[str, list[dict]]]:
+    return [assemble_street(ways) for ways in groups]
+
+
+def build_street_dataset(
+    source_path: Path, output_path: Path, workers: int | None = None
+) -> dict:
+    """
+    Собирает kharkiv_streets_full.json и бинарное хранилище из выгрузки OSM
+
+    Args:
+        source_path: .osm.pbf или Overpass JSON
+        output_path: Путь к итоговому JSON файлу (хранилище пишется рядом)
+        workers: Количество процессов для сборки геометрии (по умолчанию - CPU)
+
+    Returns:
+        Статистика сборки {ways, streets, segments, points}
+    """
+    ways = read_street_ways(source_path)
+    groups = group_street_ways(ways)
+    ordered_groups = [groups[form] for form in sorted(groups)]
+
+    chunks = [
+        ordered_groups[i : i + ASSEMBLY_CHUNK_SIZE]
+        for i in range(0, len(ordered_groups), ASSEMBLY_CHUNK_SIZE)
+    ]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            assembled = [
+                street
+                for chunk in executor.map(_assemble_streets_chunk, chunks)
+                for street in chunk
+            ]
+    else:
+        assembled = [
+            street for chunk in chunks for street in _assemble_streets_chunk(chunk)
+        ]
+
+    # Ключ улицы - название в нижнем регистре; при совпадении ключей сегменты
+    # объединяются
+    streets: dict[str, list[dict]] = {}
+    for name, segments in assembled:
+        streets.setdefault(name.lower(), []).extend(segments)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {key: streets[key] for key in sorted(streets)},
+            f,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+    os.replace(tmp_path, output_path)
+
+    store_stats = build_geometry_store(output_path, store_path_for(output_path))
+    stats = {"ways": len(ways), **store_stats}
+    logger.info("Street dataset built", path=str(output_path), **stats)
+    return stats
@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 from ..models import RepairWork
 from sqlalchemy.orm import joinedload
 from ..schemas.repair_work import RepairWorkCreate, RepairWorkUpdate, WorkStatus
+from .vector_tile_service import invalidate_vector_tiles
 
 logger = structlog.get_logger(__name__)
 
@@ -189,6 +190,7 @@ class RepairWorkService:
         self.db.refresh(repair_work)
         self._pending_status_commit = False
 
+        invalidate_vector_tiles()
         logger.info("Repair work created", repair_work_id=repair_work.id)
         return repair_work
 
@@ -220,6 +222,7 @@ class RepairWorkService:
         self.db.refresh(repair_work)
         self._pending_status_commit = False
 
+        invalidate_vector_tiles()
         logger.info("Repair work updated", repair_work_id=repair_work_id)
         return repair_work
 
@@ -236,5 +239,6 @@ class RepairWorkService:
         self.db.delete(repair_work)
         self.db.commit()
 
+        invalidate_vector_tiles()
         logger.info("Repair work deleted", repair_work_id=repair_work_id)
         return True
@@ -0,0 +1,682 @@
+"""
+Компактное бинарное хранилище геометрии улиц с доступом через mmap
+
+Формат файла (little-endian, секции выровнены по 8 байт):
+
+- заголовок ``HEADER_FORMAT`` (в конце - хэш содержимого всех секций,
+  одинаковый для одинаковых данных на любой машине, и версия исходного
+  JSON файла, из которого собрано хранилище);
+- координаты: float64 массив формы (points_count, 2) в порядке [lat, lon];
+- смещения сегментов: uint32 массив (segments_count + 1), индексы точек;
+- смещения улиц: uint32 массив (streets_count + 1), индексы сегментов;
+- таблица имен: UTF-8 строки через "\\n" - сначала ключи улиц, затем названия;
+- таблица уровней упрощения ``LEVEL_FORMAT`` (levels_count записей) и для
+  каждого уровня - свои координаты и смещения сегментов в том же формате.
+  Смещения улиц общие: упрощение сохраняет количество сегментов.
+
+Порядок осей нормализуется один раз при сборке (исходные данные могут
+содержать и [lat, lon], и [lon, lat]), поэтому потребителям не нужно
+угадывать его для каждой точки.
+
+Файл читается через ``mmap`` и NumPy views без разбора, поэтому страницы
+с координатами общие для всех worker-процессов через page cache.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, NamedTuple, TextIO
+
+import numpy as np
+import shapely
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+STORE_MAGIC = b"KHST"
+STORE_VERSION = 5
+# magic, version, streets, segments, points,
+# coords_offset, segment_offsets_offset, street_offsets_offset,
+# names_offset, names_size, levels_count, levels_offset, content_hash,
+# source_mtime_ns, source_size
+HEADER_FORMAT = "<4sIIIIQQQQQIQ16sqQ"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+# tolerance_m, points, coords_offset, segment_offsets_offset
+LEVEL_FORMAT = "<dQQQ"
+LEVEL_SIZE = struct.calcsize(LEVEL_FORMAT)
+# Допуски упрощения (Douglas-Peucker, метры), хранимые рядом с полной геометрией
+SIMPLIFY_TOLERANCES_M = (2.0, 8.0, 32.0, 128.0)
+# Метров в одном градусе широты и долготы (на экваторе)
+METERS_PER_DEGREE_LAT = 110_574.0
+METERS_PER_DEGREE_LON = 111_320.0
+SECTION_ALIGNMENT = 8
+# Диапазоны координат Харькова для определения порядка осей в исходных данных
+KHARKIV_LAT_RANGE = (49.0, 51.0)
+KHARKIV_LON_RANGE = (35.0, 37.0)
+# Размер блока чтения при потоковом разборе JSON
+STREAM_CHUNK_SIZE = 1 << 16
+# Размер одной точки (две координаты float64) в байтах
+POINT_SIZE = 16
+
+
+class StreetLocation(NamedTuple):
+    """Положение улицы в хранилище: номер и диапазон байт координат [start, stop)"""
+
+    index: int
+    byte_start: int
+    byte_stop: int
+    # Уровень детализации: 0 - полная геометрия, 1.. - упрощенные уровни
+    level: int = 0
+
+
+class GeometryLevel(NamedTuple):
+    """Координаты и смещения сегментов одного уровня детализации"""
+
+    tolerance_m: float
+    coords: np.ndarray
+    segment_offsets: np.ndarray
+    coords_offset: int
+
+
+def _aligned(offset: int) -> int:
+    """Выравнивает смещение секции по SECTION_ALIGNMENT"""
+    return (offset + SECTION_ALIGNMENT - 1) // SECTION_ALIGNMENT * SECTION_ALIGNMENT
+
+
+def store_path_for(source_path: Path) -> Path:
+    """Путь к бинарному хранилищу рядом с исходным JSON файлом"""
+    return source_path.with_suffix(".bin")
+
+
+def source_signature(source_path: Path) -> tuple[int, int] | None:
+    """Версия исходного JSON файла (mtime_ns, размер) или None, если файла нет"""
+    try:
+        stat = source_path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_source_signature(store_path: Path) -> tuple[int, int] | None:
+    """
+    Версия исходного JSON, записанная в заголовке хранилища
+
+    Returns:
+        (mtime_ns, размер) или None, если файла нет или формат устарел
+    """
+    try:
+        with open(store_path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+    except OSError:
+        return None
+    if len(header) < HEADER_SIZE:
+        return None
+    fields = struct.unpack(HEADER_FORMAT, header)
+    if fields[0] != STORE_MAGIC or fields[1] != STORE_VERSION:
+        return None
+    return fields[-2], fields[-1]
+
+
+def is_store_stale(source_path: Path, store_path: Path) -> bool:
+    """
+    Проверяет, нужно ли пересобрать хранилище из исходного JSON
+
+    Хранилище актуально, только если версия JSON в его заголовке точно
+    совпадает с текущей: файл, замененный копией со старым mtime
+    (cp -p, rsync -t, tar), тоже приводит к пересборке.
+    """
+    if not store_path.exists():
+        return True
+    signature = source_signature(source_path)
+    if signature is None:
+        # Разворачивание только с бинарным файлом - используем его как есть
+        return False
+    return read_source_signature(store_path) != signature
+
+
+def canonical_point(point: list[float]) -> tuple[float, float]:
+    """
+    Приводит точку исходных данных к порядку осей [lat, lon]
+
+    Точки в порядке [lon, lat] распознаются по диапазонам координат
+    Харькова; неопознанные точки считаются уже записанными как [lat, lon].
+    """
+    first, second = float(point[0]), float(point[1])
+    if (
+        KHARKIV_LON_RANGE[0] <= first <= KHARKIV_LON_RANGE[1]
+        and KHARKIV_LAT_RANGE[0] <= second <= KHARKIV_LAT_RANGE[1]
+    ):
+        return second, first
+    return first, second
+
+
+def simplify_segments(
+    coords: np.ndarray, segment_offsets: np.ndarray, tolerance_m: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Упрощает все сегменты алгоритмом Douglas-Peucker
+
+    Упрощение выполняется в локальной проекции в метрах, концы сегментов
+    и количество сегментов сохраняются; сегменты короче двух точек
+    остаются без изменений.
+
+    Args:
+        coords: Координаты формы (n, 2) в порядке [lat, lon]
+        segment_offsets: Смещения сегментов в точках (segments + 1)
+        tolerance_m: Допуск упрощения в метрах
+
+    Returns:
+        Упрощенные координаты (m, 2) и новые смещения сегментов (uint32)
+    """
+    segment_offsets = segment_offsets.astype(np.int64)
+    lengths = np.diff(segment_offsets)
+    if not len(coords):
+        return coords.reshape(0, 2), segment_offsets.astype(np.uint32)
+
+    meters_per_lon = METERS_PER_DEGREE_LON * np.cos(np.radians(coords[:, 0].mean()))
+    scale = np.array([METERS_PER_DEGREE_LAT, meters_per_lon])
+
+    new_lengths = lengths.copy()
+    valid = lengths >= 2
+    if valid.any():
+        point_segments = np.repeat(np.arange(len(lengths)), lengths)
+        point_mask = valid[point_segments]
+        line_ids = np.cumsum(valid) - 1
+        lines = shapely.linestrings(
+            coords[point_mask] * scale, indices=line_ids[point_segments[point_mask]]
+        )
+        simplified = shapely.simplify(lines, tolerance_m, preserve_topology=False)
+        # Выродившиеся линии (например, короткие замкнутые) оставляем как есть
+        degenerate = shapely.get_num_points(simplified) < 2
+        simplified[degenerate] = lines[degenerate]
+        simplified_coords, simplified_index = shapely.get_coordinates(
+            simplified, return_index=True
+        )
+        new_lengths[valid] = np.bincount(simplified_index, minlength=valid.sum())
+        simplified_coords /= scale
+    else:
+        simplified_coords = np.empty((0, 2))
+        simplified_index = np.empty(0, dtype=np.int64)
+
+    new_offsets = np.concatenate([[0], np.cumsum(new_lengths)]).astype(np.uint32)
+    if valid.all():
+        return simplified_coords, new_offsets
+
+    # Собираем сегменты в исходном порядке: упрощенные и неизмененные короткие
+    valid_starts = np.concatenate([[0], np.cumsum(new_lengths[valid])])
+    valid_position = np.cumsum(valid) - 1
+    parts: list[np.ndarray] = []
+    for segment, is_valid in enumerate(valid):
+        if is_valid:
+            line = valid_position[segment]
+            parts.append(simplified_coords[valid_starts[line] : valid_starts[line + 1]])
+        elif lengths[segment]:
+            start = segment_offsets[segment]
+            parts.append(coords[start : start + lengths[segment]])
+
+    new_coords = np.concatenate(parts) if parts else np.empty((0, 2))
+    return new_coords, new_offsets
+
+
+def iter_json_object_items(
+    stream: TextIO, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[tuple[str, Any]]:
+    """
+    Потоково разбирает JSON объект верхнего уровня, по одной паре за раз
+
+    В памяти одновременно находятся только текущий блок файла и значение
+    одного ключа, а не весь текст и все дерево объектов.
+
+    Args:
+        stream: Текстовый поток с JSON объектом
+        chunk_size: Размер блока чтения
+
+    Yields:
+        Пары (ключ, значение)
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def read_more() -> None:
+        nonlocal buffer, pos, eof
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+            return
+        # Отбрасываем уже разобранную часть буфера
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def next_char() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if eof:
+                raise ValueError("Unexpected end of JSON stream")
+            read_more()
+
+    def decode_value() -> Any:
+        nonlocal pos
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # Значение, упирающееся в конец буфера, может быть неполным
+                if end < len(buffer) or eof:
+                    pos = end
+                    return value
+            read_more()
+
+    if next_char() != "{":
+        raise ValueError("JSON stream must contain an object")
+    pos += 1
+    if next_char() == "}":
+        return
+
+    while True:
+        key = decode_value()
+        if not isinstance(key, str) or next_char() != ":":
+            raise ValueError("Malformed JSON object key")
+        pos += 1
+        next_char()
+        yield key, decode_value()
+
+        separator = next_char()
+        pos += 1
+        if separator == "}":
+            return
+        if separator != ",":
+            raise ValueError("Malformed JSON object separator")
+        next_char()
+
+
+def write_geometry_store(
+    target_path: Path,
+    keys: list[str],
+    names: list[str],
+    coords: array,
+    segment_offsets: array,
+    street_offsets: array,
+    levels: list[tuple[float, np.ndarray, np.ndarray]] | None = None,
+    source: tuple[int, int] = (0, 0),
+) -> None:
+    """
+    Записывает бинарное хранилище атомарно (через временный файл)
+
+    Args:
+        target_path: Путь к итоговому файлу
+        keys: Ключи улиц
+        names: Оригинальные названия улиц (в том же порядке)
+        coords: Плоский массив координат float64
+        segment_offsets: Смещения сегментов в точках (uint32)
+        street_offsets: Смещения улиц в сегментах (uint32)
+        levels: Упрощенные уровни (допуск, координаты (m, 2), смещения сегментов)
+        source: Версия исходного JSON файла (mtime_ns, размер)
+    """
+    levels = levels or []
+    names_blob = "\n".join(keys + names).encode("utf-8")
+
+    coords_offset = _aligned(HEADER_SIZE)
+    segment_offsets_offset = _aligned(coords_offset + coords.itemsize * len(coords))
+    street_offsets_offset = _aligned(
+        segment_offsets_offset + segment_offsets.itemsize * len(segment_offsets)
+    )
+    names_offset = _aligned(
+        street_offsets_offset + street_offsets.itemsize * len(street_offsets)
+    )
+    levels_offset = _aligned(names_offset + len(names_blob))
+
+    sections = [
+        (coords_offset, coords.tobytes()),
+        (segment_offsets_offset, segment_offsets.tobytes()),
+        (street_offsets_offset, street_offsets.tobytes()),
+        (names_offset, names_blob),
+    ]
+
+    # Таблица уровней и их секции
+    level_table = b""
+    offset = _aligned(levels_offset + LEVEL_SIZE * len(levels))
+    for tolerance_m, level_coords, level_segment_offsets in levels:
+        level_coords_bytes = np.ascontiguousarray(level_coords, dtype="<f8").tobytes()
+        level_offsets_bytes = np.asarray(level_segment_offsets, dtype="<u4").tobytes()
+        level_coords_offset = offset
+        level_offsets_offset = _aligned(level_coords_offset + len(level_coords_bytes))
+        offset = _aligned(level_offsets_offset + len(level_offsets_bytes))
+
+        level_table += struct.pack(
+            LEVEL_FORMAT,
+            tolerance_m,
+            len(level_coords),
+            level_coords_offset,
+            level_offsets_offset,
+        )
+        sections.append((level_coords_offset, level_coords_bytes))
+        sections.append((level_offsets_offset, level_offsets_bytes))
+    sections.insert(4, (levels_offset, level_table))
+
+    # Хэш содержимого вычисляется один раз при сборке и хранится в заголовке
+    content_hash = hashlib.sha1()
+    for _, payload in sections:
+        content_hash.update(payload)
+
+    header = struct.pack(
+        HEADER_FORMAT,
+        STORE_MAGIC,
+        STORE_VERSION,
+        len(keys),
+        len(segment_offsets) - 1,
+        len(coords) // 2,
+        coords_offset,
+        segment_offsets_offset,
+        street_offsets_offset,
+        names_offset,
+        len(names_blob),
+        len(levels),
+        levels_offset,
+        content_hash.digest()[:16],
+        *source,
+    )
+
+    # Имя временного файла уникально для процесса: несколько воркеров могут
+    # пересобирать хранилище одновременно
+    tmp_path = target_path.with_name(f"{target_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for offset, payload in sections:
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(payload)
+    os.replace(tmp_path, target_path)
+
+
+def build_geometry_store(source_path: Path, target_path: Path) -> dict:
+    """
+    Собирает бинарное хранилище из полного JSON файла улиц
+
+    Файл читается потоково: каждая улица сразу переводится в компактный
+    вид (плоские массивы координат и смещений), и ее JSON объекты
+    освобождаются до чтения следующей улицы.
+
+    Args:
+        source_path: Путь к kharkiv_streets_full.json
+        target_path: Путь к итоговому бинарному файлу
+
+    Returns:
+        Статистика сборки {streets, segments, points}
+    """
+    # Версию фиксируем до чтения: изменение файла во время сборки будет
+    # замечено при следующей проверке
+    source = source_signature(source_path) or (0, 0)
+    keys: list[str] = []
+    names: list[str] = []
+    coords = array("d")
+    segment_offsets = array("I", [0])
+    street_offsets = array("I", [0])
+
+    with open(source_path, encoding="utf-8") as f:
+        for street_key, segments_list in iter_json_object_items(f):
+            if not segments_list:
+                continue
+
+            keys.append(street_key)
+            # Берем название из первого сегмента
+            names.append(segments_list[0].get("name", street_key))
+
+            for segment_info in segments_list:
+                coordinates = segment_info.get("coordinates")
+                if not coordinates:
+                    continue
+                for point in coordinates:
+                    coords.extend(canonical_point(point))
+                segment_offsets.append(len(coords) // 2)
+
+            street_offsets.append(len(segment_offsets) - 1)
+
+    # Упрощенные уровни для отображения при малом масштабе
+    points = np.frombuffer(coords, dtype=np.float64).reshape(-1, 2)
+    offsets = np.frombuffer(segment_offsets, dtype=np.uint32)
+    levels = [
+        (tolerance_m, *simplify_segments(points, offsets, tolerance_m))
+        for tolerance_m in SIMPLIFY_TOLERANCES_M
+    ]
+
+    write_geometry_store(
+        target_path,
+        keys,
+        names,
+        coords,
+        segment_offsets,
+        street_offsets,
+        levels,
+        source,
+    )
+
+    stats = {
+        "streets": len(keys),
+        "segments": len(segment_offsets) - 1,
+        "points": len(coords) // 2,
+        "simplified_points": [len(level[1]) for level in levels],
+    }
+    logger.info("Street geometry store built", path=str(target_path), **stats)
+    return stats
+
+
+class GeometryStore:
+    """Доступ только для чтения к бинарному хранилищу через mmap"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic,
+            version,
+            streets_count,
+            segments_count,
+            points_count,
+            coords_offset,
+            segment_offsets_offset,
+            street_offsets_offset,
+            names_offset,
+            names_size,
+            levels_count,
+            levels_offset,
+            content_hash,
+            source_mtime_ns,
+            source_size,
+        ) = struct.unpack_from(HEADER_FORMAT, self._mmap, 0)
+
+        if magic != STORE_MAGIC or version != STORE_VERSION:
+            self._mmap.close()
+            raise ValueError(f"Unsupported street geometry store: {path}")
+
+        # Хэш содержимого хранилища (версия набора данных)
+        self.content_hash: str = content_hash.hex()
+        # Версия исходного JSON файла (mtime_ns, размер), из которого собрано
+        self.source_signature: tuple[int, int] = (source_mtime_ns, source_size)
+
+        # NumPy views поверх mmap - данные не копируются
+        self.coords = np.frombuffer(
+            self._mmap, dtype="<f8", count=points_count * 2, offset=coords_offset
+        ).reshape(points_count, 2)
+        self.segment_offsets = np.frombuffer(
+            self._mmap,
+            dtype="<u4",
+            count=segments_count + 1,
+            offset=segment_offsets_offset,
+        )
+        self.street_offsets = np.frombuffer(
+            self._mmap,
+            dtype="<u4",
+            count=streets_count + 1,
+            offset=street_offsets_offset,
+        )
+
+        lines = (
+            self._mmap[names_offset : names_offset + names_size]
+            .decode("utf-8")
+            .split("\n")
+        )
+        self.keys: list[str] = lines[:streets_count]
+        self.names: list[str] = lines[streets_count:]
+
+        # Уровень 0 - полная геометрия, далее - упрощенные по возрастанию допуска
+        self.levels: list[GeometryLevel] = [
+            GeometryLevel(0.0, self.coords, self.segment_offsets, coords_offset)
+        ]
+        for i in range(levels_count):
+            (
+                tolerance_m,
+                level_points,
+                level_coords_offset,
+                level_segment_offsets_offset,
+            ) = struct.unpack_from(
+                LEVEL_FORMAT, self._mmap, levels_offset + i * LEVEL_SIZE
+            )
+            self.levels.append(
+                GeometryLevel(
+                    tolerance_m=tolerance_m,
+                    coords=np.frombuffer(
+                        self._mmap,
+                        dtype="<f8",
+                        count=level_points * 2,
+                        offset=level_coords_offset,
+                    ).reshape(level_points, 2),
+                    segment_offsets=np.frombuffer(
+                        self._mmap,
+                        dtype="<u4",
+                        count=segments_count + 1,
+                        offset=level_segment_offsets_offset,
+                    ),
+                    coords_offset=level_coords_offset,
+                )
+            )
+
+    @property
+    def streets_count(self) -> int:
+        return len(self.keys)
+
+    def segments_count(self, street_index: int) -> int:
+        """Количество сегментов улицы"""
+        return int(
+            self.street_offsets[street_index + 1] - self.street_offsets[street_index]
+        )
+
+    def level_for_tolerance(self, tolerance_m: float) -> int:
+        """
+        Самый грубый уровень, допуск которого не превышает заданный
+
+        Args:
+            tolerance_m: Допустимое отклонение геометрии в метрах
+
+        Returns:
+            Номер уровня (0 - полная геометрия)
+        """
+        level = 0
+        for i, geometry_level in enumerate(self.levels):
+            if geometry_level.tolerance_m <= tolerance_m:
+                level = i
+        return level
+
+    def street_segments(self, street_index: int, level: int = 0) -> list[np.ndarray]:
+        """
+        Возвращает сегменты улицы как NumPy views на координаты
+
+        Args:
+            street_index: Порядковый номер улицы в хранилище
+            level: Уровень детализации (0 - полная геометрия)
+
+        Returns:
+            Список массивов формы (n, 2)
+        """
+        geometry_level = self.levels[level]
+        first_segment = int(self.street_offsets[street_index])
+        last_segment = int(self.street_offsets[street_index + 1])
+        bounds = geometry_level.segment_offsets[first_segment : last_segment + 1]
+        return [
+            geometry_level.coords[int(bounds[i]) : int(bounds[i + 1])]
+            for i in range(len(bounds) - 1)
+        ]
+
+    def locate(self, street_index: int, level: int = 0) -> StreetLocation:
+        """Вычисляет диапазон байт координат улицы в файле"""
+        geometry_level = self.levels[level]
+        segment_offsets = geometry_level.segment_offsets
+        first_point = int(segment_offsets[int(self.street_offsets[street_index])])
+        last_point = int(segment_offsets[int(self.street_offsets[street_index + 1])])
+        return StreetLocation(
+            index=street_index,
+            byte_start=geometry_level.coords_offset + first_point * POINT_SIZE,
+            byte_stop=geometry_level.coords_offset + last_point * POINT_SIZE,
+            level=level,
+        )
+
+    def decode(self, location: StreetLocation) -> list[list[list[float]]]:
+        """
+        Декодирует координаты одной улицы в списки Python
+
+        Читаются только байты из диапазона улицы, остальные страницы
+        файла не затрагиваются.
+
+        Args:
+            location: Положение улицы из locate()
+
+        Returns:
+            Список сегментов [[[lat, lon], ...], ...]
+        """
+        points = np.frombuffer(
+            self._mmap,
+            dtype="<f8",
+            count=(location.byte_stop - location.byte_start) // 8,
+            offset=location.byte_start,
+        ).reshape(-1, 2)
+
+        geometry_level = self.levels[location.level]
+        first_segment = int(self.street_offsets[location.index])
+        last_segment = int(self.street_offsets[location.index + 1])
+        bounds = geometry_level.segment_offsets[first_segment : last_segment + 1] - (
+            (location.byte_start - geometry_level.coords_offset) // POINT_SIZE
+        )
+        return [
+            points[int(bounds[i]) : int(bounds[i + 1])].tolist()
+            for i in range(len(bounds) - 1)
+        ]
+
+
+def open_geometry_store(source_path: Path) -> GeometryStore:
+    """
+    Открывает бинарное хранилище, при необходимости собирая его из JSON
+
+    Args:
+        source_path: Путь к kharkiv_streets_full.json
+
+    Returns:
+        Открытое хранилище
+    """
+    store_path = store_path_for(source_path)
+    if is_store_stale(source_path, store_path):
+        logger.info("Building street geometry store", source=str(source_path))
+        build_geometry_store(source_path, store_path)
+
+    try:
+        return GeometryStore(store_path)
+    except ValueError:
+        # Хранилище старой версии формата - пересобираем из JSON
+        if not source_path.exists():
+            raise
+        logger.info("Rebuilding outdated street geometry store", path=str(store_path))
+        build_geometry_store(source_path, store_path)
+        return GeometryStore(store_path)
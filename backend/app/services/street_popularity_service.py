@@ -0,0 +1,72 @@
+"""
+Популярность улиц по истории ремонтных работ для ранжирования автокомплита
+"""
+
+import asyncio
+
+import structlog
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models import RepairWork
+from .fast_geometry_service import get_fast_geometry_service
+
+logger = structlog.get_logger(__name__)
+settings = get_settings()
+
+
+def load_street_name_counts(db: Session) -> dict[str, int]:
+    """
+    Считает ремонтные работы по названию улицы одним GROUP BY запросом
+
+    Args:
+        db: Сессия базы данных
+
+    Returns:
+        Словарь название улицы -> количество работ
+    """
+    rows = (
+        db.query(RepairWork.street_name, func.count(RepairWork.id))
+        .filter(RepairWork.street_name.isnot(None))
+        .group_by(RepairWork.street_name)
+        .all()
+    )
+    return {street_name: count for street_name, count in rows if street_name}
+
+
+def refresh_street_popularity() -> int:
+    """
+    Перечитывает популярность улиц из БД и применяет ее к индексу улиц
+
+    Returns:
+        Количество различных названий улиц в таблице
+    """
+    db = SessionLocal()
+    try:
+        counts = load_street_name_counts(db)
+    finally:
+        db.close()
+
+    get_fast_geometry_service().apply_street_popularity(counts)
+    return len(counts)
+
+
+async def run_street_popularity_refresh(interval_seconds: int) -> None:
+    """
+    Периодически обновляет популярность улиц в фоне
+
+    Запрос к БД выполняется в отдельном потоке, чтобы не блокировать
+    event loop. Ошибки логируются, обновление продолжается по расписанию.
+
+    Args:
+        interval_seconds: Интервал между обновлениями
+    """
+    while True:
+        try:
+            street_names = await asyncio.to_thread(refresh_street_popularity)
+            logger.info("Street popularity refreshed", street_names=street_names)
+        except Exception as e:
+            logger.error("Street popularity refresh failed", error=str(e))
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,275 @@
+"""
+Поисковые индексы по названиям улиц для автокомплита
+"""
+
+import heapq
+from bisect import bisect_left
+from collections import Counter
+
+from ..utils.street_names import (
+    latin_search_token,
+    latin_street_name_variants,
+    search_tokens,
+    street_name_tokens,
+    street_name_variants,
+)
+
+# Для коротких префиксов результаты вычисляются заранее
+TOP_PREFIX_LENGTH = 3
+# Максимальное количество заранее вычисленных результатов на префикс
+TOP_PREFIX_RESULTS = 50
+# Минимальная доля общих триграмм для нечеткого совпадения
+TRIGRAM_MIN_SCORE = 0.5
+# Верхняя граница для диапазона bisect по префиксу
+_PREFIX_UPPER_BOUND = chr(0x10FFFF)
+
+
+def tokenize(text: str) -> list[str]:
+    """Разбивает название улицы на нормализованные токены"""
+    return street_name_tokens(text)
+
+
+def latin_tokenize(text: str) -> list[str]:
+    """Токены названия в латинской транслитерации (латинский скелет)"""
+    return [latin_search_token(token) for token in street_name_tokens(text)]
+
+
+def _trigrams_of_tokens(tokens: list[str]) -> set[str]:
+    normalized = " ".join(tokens)
+    return {normalized[i : i + 3] for i in range(len(normalized) - 2)}
+
+
+def trigrams(text: str) -> set[str]:
+    """Множество триграмм поискового запроса (слова через пробел)"""
+    return _trigrams_of_tokens(search_tokens(text))
+
+
+def name_trigrams(name: str) -> set[str]:
+    """Триграммы названия улицы: кириллическое написание и транслитерация"""
+    return _trigrams_of_tokens(tokenize(name)) | _trigrams_of_tokens(
+        latin_tokenize(name)
+    )
+
+
+class StreetSearchIndex:
+    """
+    Индекс начала слов для поиска улиц по префиксу
+
+    Улицы нумеруются по рангу (короче название - выше), поэтому номер
+    улицы одновременно является ее позицией в выдаче. Для каждого токена
+    названия хранится отсортированный массив (токен, номер улицы), по
+    которому диапазон префикса находится через bisect. Для префиксов до
+    TOP_PREFIX_LENGTH символов лучшие результаты вычислены заранее.
+    Токены включают латинскую транслитерацию названия, поэтому запросы
+    латиницей ("Sums", "Nauk") ищутся по тому же массиву.
+
+    В индекс входят все ключи улиц (их используют алиасы и нечеткий поиск),
+    но одинаковые названия выдаются автокомплитом один раз: в массив
+    токенов попадает только первая улица с каждым названием.
+    """
+
+    def __init__(self, streets: list[tuple[str, str]]):
+        """
+        Args:
+            streets: Пары (ключ улицы, оригинальное название)
+        """
+        # Сортировка устойчива: из улиц с одинаковым названием первой остается
+        # та, что раньше встречается в наборе данных
+        ranked = sorted(streets, key=lambda item: (len(item[1]), item[1]))
+
+        self.keys: list[str] = []
+        self.names: list[str] = []
+        # Номер первой улицы с таким же названием (для нее самой - свой номер)
+        self.name_ids: list[int] = []
+        self._street_tokens: list[tuple[str, ...]] = []
+        token_entries: list[tuple[str, int]] = []
+        name_ids: dict[str, int] = {}
+
+        for street_key, name in ranked:
+            street_id = len(self.keys)
+            tokens = tuple(
+                dict.fromkeys(
+                    tokenize(name) + tokenize(street_key) + latin_tokenize(name)
+                )
+            )
+            self.keys.append(street_key)
+            self.names.append(name)
+            self.name_ids.append(name_ids.setdefault(name, street_id))
+            self._street_tokens.append(tokens)
+            # Одинаковые названия показываем в автокомплите один раз
+            if self.name_ids[street_id] == street_id:
+                token_entries.extend((token, street_id) for token in tokens)
+
+        token_entries.sort()
+        self._tokens = [token for token, _ in token_entries]
+        self._token_streets = [street_id for _, street_id in token_entries]
+
+        # Заранее вычисленные лучшие результаты для коротких префиксов
+        self._top_prefixes: dict[str, list[int]] = {}
+        for street_id, tokens in enumerate(self._street_tokens):
+            if self.name_ids[street_id] != street_id:
+                continue
+            for token in tokens:
+                for length in range(1, min(len(token), TOP_PREFIX_LENGTH) + 1):
+                    top = self._top_prefixes.setdefault(token[:length], [])
+                    if len(top) < TOP_PREFIX_RESULTS and (
+                        not top or top[-1] != street_id
+                    ):
+                        top.append(street_id)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _streets_with_token_prefix(self, prefix: str) -> set[int]:
+        """Номера улиц, у которых есть токен с заданным префиксом"""
+        lo = bisect_left(self._tokens, prefix)
+        hi = bisect_left(self._tokens, prefix + _PREFIX_UPPER_BOUND, lo)
+        return set(self._token_streets[lo:hi])
+
+    def _has_token_prefix(self, street_id: int, prefix: str) -> bool:
+        return any(token.startswith(prefix) for token in self._street_tokens[street_id])
+
+    def matches(self, street_id: int, query_tokens: list[str]) -> bool:
+        """Является ли каждое слово запроса началом какого-либо слова улицы"""
+        return bool(query_tokens) and all(
+            self._has_token_prefix(street_id, token) for token in query_tokens
+        )
+
+    def search(self, query: str, limit: int = 10) -> list[int]:
+        """
+        Ищет улицы, у которых каждое слово запроса является началом слова названия
+
+        Args:
+            query: Поисковый запрос
+            limit: Максимальное количество результатов
+
+        Returns:
+            Номера улиц в порядке ранга
+        """
+        query_tokens = search_tokens(query)
+        if not query_tokens:
+            return []
+
+        if len(query_tokens) == 1 and len(query_tokens[0]) <= TOP_PREFIX_LENGTH:
+            if limit <= TOP_PREFIX_RESULTS:
+                return self._top_prefixes.get(query_tokens[0], [])[:limit]
+
+        # Диапазон ищем по самому длинному (самому избирательному) слову
+        primary = max(query_tokens, key=len)
+        query_tokens.remove(primary)
+        candidates = self._streets_with_token_prefix(primary)
+
+        if query_tokens:
+            candidates = {
+                street_id
+                for street_id in candidates
+                if all(self._has_token_prefix(street_id, t) for t in query_tokens)
+            }
+
+        return heapq.nsmallest(limit, candidates)
+
+
+class StreetTrigramIndex:
+    """
+    Инвертированный индекс триграмм по названиям улиц
+
+    Поддерживает поиск по подстроке внутри названия и запросы с небольшими
+    опечатками: кандидаты собираются только из списков улиц для триграмм
+    запроса и ранжируются по доле совпавших триграмм. Индексируются и
+    названия, и ключи улиц - нечеткий поиск сравнивает запрос с ключами.
+    """
+
+    def __init__(self, streets: list[tuple[str, str]]):
+        """
+        Args:
+            streets: Пары (ключ улицы, оригинальное название); номер улицы -
+                позиция в списке
+        """
+        postings: dict[str, list[int]] = {}
+        for street_id, (street_key, name) in enumerate(streets):
+            street_trigrams = name_trigrams(name) | _trigrams_of_tokens(
+                tokenize(street_key)
+            )
+            for trigram in street_trigrams:
+                postings.setdefault(trigram, []).append(street_id)
+        self._postings = {trigram: tuple(ids) for trigram, ids in postings.items()}
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        min_score: float = TRIGRAM_MIN_SCORE,
+        include_ties: bool = False,
+    ) -> list[tuple[int, float]]:
+        """
+        Ищет улицы по доле общих с запросом триграмм
+
+        Args:
+            query: Поисковый запрос (минимум 3 символа)
+            limit: Максимальное количество результатов
+            min_score: Минимальная доля совпавших триграмм запроса (0-1)
+            include_ties: Добавить сверх limit улицы с той же оценкой, что у
+                последнего результата (кандидаты для нечеткого поиска не
+                должны обрезаться по рангу названия)
+
+        Returns:
+            Пары (номер улицы, оценка) по убыванию оценки, затем по рангу
+        """
+        query_trigrams = trigrams(query)
+        if not query_trigrams:
+            return []
+
+        hits: Counter[int] = Counter()
+        for trigram in query_trigrams:
+            hits.update(self._postings.get(trigram, ()))
+
+        min_hits = max(1, int(len(query_trigrams) * min_score + 0.999))
+        best = heapq.nsmallest(
+            limit,
+            (
+                (-count, street_id)
+                for street_id, count in hits.items()
+                if count >= min_hits
+            ),
+        )
+        if include_ties and len(best) == limit:
+            last_count, last_id = best[-1]
+            best.extend(
+                sorted(
+                    (-count, street_id)
+                    for street_id, count in hits.items()
+                    if -count == last_count and street_id > last_id
+                )
+            )
+        return [
+            (street_id, round(-neg_count / len(query_trigrams), 3))
+            for neg_count, street_id in best
+        ]
+
+
+def build_alias_index(keys: list[str], names: list[str]) -> dict[str, str]:
+    """
+    Строит индекс канонических форм названий улиц
+
+    Для каждой улицы регистрируются канонические формы ее названия и ключа
+    (с типом улицы и без него), поэтому "вул. Сумська", "Сумська вулиця" и
+    "сумська" находятся одним обращением к словарю. Латинские формы
+    (транслитерация) регистрируются там же: "Sumska" и "vul. Sumska" тоже.
+    При совпадении форм у нескольких улиц побеждает улица с более высоким
+    рангом.
+
+    Args:
+        keys: Ключи улиц в порядке ранга
+        names: Оригинальные названия улиц в том же порядке
+
+    Returns:
+        Словарь каноническая форма -> ключ улицы
+    """
+    aliases: dict[str, str] = {}
+    for street_key, name in zip(keys, names, strict=True):
+        for text in (name, street_key):
+            for form in street_name_variants(text):
+                aliases.setdefault(form, street_key)
+        for form in latin_street_name_variants(name):
+            aliases.setdefault(form, street_key)
+    return aliases
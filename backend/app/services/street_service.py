@@ -18,12 +18,15 @@ from ..schemas.street import (
     StreetSearchResult,
 )
 from ..utils.exceptions import ExternalServiceError
+from ..utils.street_names import normalize_street_text, split_street_type
 
 logger = structlog.get_logger(__name__)
 settings = get_settings()
 
 # Максимальное расстояние для привязки точки к улице (метры)
 MAX_SNAP_DISTANCE_M: float = 120.0
+# Город локального набора данных улиц
+LOCAL_DATA_CITY = "Харків"
 
 
 class StreetService:
@@ -382,6 +385,42 @@ class StreetService:
             logger.error("Failed reverse geocoding", error=str(e))
             return None
 
+    def reverse_geocode_local(
+        self, lat: float, lon: float, max_distance_m: float = MAX_SNAP_DISTANCE_M
+    ) -> ReverseGeocodeResult | None:
+        """
+        Обратное геокодирование по локальному индексу улиц (без Nominatim)
+
+        Возвращает ближайшую улицу, расстояние до нее и точку привязки.
+        Номер дома в локальных данных отсутствует.
+
+        Args:
+            lat: Широта
+            lon: Долгота
+            max_distance_m: Максимальное расстояние до улицы (метры)
+
+        Returns:
+            Информация об улице или None если рядом нет улиц
+        """
+        from .fast_geometry_service import get_fast_geometry_service
+
+        nearest = get_fast_geometry_service().find_nearest_street(
+            lat, lon, max_distance_m
+        )
+        if not nearest:
+            logger.info("No local street near point", lat=lat, lon=lon)
+            return None
+
+        return ReverseGeocodeResult(
+            display_name=f"{nearest['name']}, {LOCAL_DATA_CITY}",
+            road=nearest["name"],
+            city=LOCAL_DATA_CITY,
+            street_key=nearest["key"],
+            distance_meters=nearest["distance_meters"],
+            snapped_point=nearest["point"],
+            source="local",
+        )
+
     async def get_all_street_segments(
         self, query: StreetSearchQuery
     ) -> list[StreetSearchResult]:
@@ -507,21 +546,14 @@ class StreetService:
         if "площа" in query_lower:
             query_keywords.extend(["площа", "пл"])
 
-        # Добавляем основное название без типа улицы
-        main_name_parts = (
-            query_lower.replace("проспект", "")
-            .replace("вулиця", "")
-            .replace("вул.", "")
-            .replace("бульвар", "")
-            .replace("площа", "")
-            .strip()
-            .split()
-        )
+        # Добавляем основное название без типа улицы (в нормализованном виде)
+        _, main_name_parts = split_street_type(query.query)
 
         filtered_results = []
 
         for result in unique_results:
             street_name = result.display_name.split(",")[0].strip().lower()
+            normalized_street_name = normalize_street_text(street_name)
 
             # Проверяем различные варианты совпадения
             match_found = False
@@ -533,7 +565,7 @@ class StreetService:
             # 2. Проверяем по основным частям названия
             elif main_name_parts:
                 for part in main_name_parts:
-                    if len(part) > 2 and part in street_name:
+                    if len(part) > 2 and part in normalized_street_name:
                         match_found = True
                         break
 
@@ -543,7 +575,7 @@ class StreetService:
                     if keyword in street_name:
                         # Если нашли тип улицы, проверяем основное название
                         for part in main_name_parts:
-                            if len(part) > 2 and part in street_name:
+                            if len(part) > 2 and part in normalized_street_name:
                                 match_found = True
                                 break
                         if match_found:
@@ -906,31 +938,22 @@ class StreetService:
         )
 
         try:
-            # Используем FastGeometryService для получения геометрии из локальных данных
-            from .fast_geometry_service import FastGeometryService
+            # Используем общий индекс улиц для получения геометрии из локальных данных
+            from .fast_geometry_service import get_fast_geometry_service
 
-            fast_service = FastGeometryService()
+            fast_service = get_fast_geometry_service()
 
-            # Получаем геометрию улицы
-            street_geometry = fast_service.find_street_geometry(street_name)
-            if not street_geometry:
+            # Определяем улицу в локальном индексе
+            street_key = fast_service.find_street_key(street_name)
+            if not street_key:
                 raise ExternalServiceError("Не удалось найти улицу в локальных данных")
 
-            # Получаем все сегменты улицы
-            street_segments = []
-            if hasattr(street_geometry, "segments") and street_geometry.segments:
-                # Если есть множественные сегменты - работаем с ними отдельно
-                for segment in street_geometry.segments:
-                    if len(segment) >= 2:
-                        # Конвертируем каждый сегмент в правильный формат
-                        converted_segment = self._convert_coordinates_format(segment)
-                        street_segments.append(converted_segment)
-            elif street_geometry.coordinates:
-                # Если есть единая линия
-                converted_coords = self._convert_coordinates_format(
-                    street_geometry.coordinates
-                )
-                street_segments.append(converted_coords)
+            # Сегменты улицы уже нормализованы в порядок [lon, lat] (x, y)
+            street_segments = [
+                segment
+                for segment in fast_service.get_street_lines(street_key)
+                if len(segment) >= 2
+            ]
 
             if not street_segments:
                 raise ExternalServiceError("Нет координат для улицы")
@@ -938,33 +961,31 @@ class StreetService:
             # === ТОЧНОЕ ОТРЕЗАНИЕ ЧЕРЕЗ SHAPELY (MERGE + SUBSTRING) ===
             segment_coords = []
             try:
-                from shapely.geometry import LineString, MultiLineString, Point
-                from shapely.ops import linemerge
+                import shapely
+                from shapely.geometry import Point
                 from shapely.ops import substring as shp_substring
 
-                # Собираем MultiLineString
-                line_parts = [
-                    LineString(seg) for seg in street_segments if len(seg) >= 2
-                ]
-                merged_line = linemerge(MultiLineString(line_parts))
-
-                # Если получилась MultiLineString, берём ту часть, где лежат обе проекции
-                if merged_line.geom_type == "MultiLineString":
-                    # Находим ту, где минимальная сумма расстояний до кликов
-                    best_part = None
-                    best_score = float("inf")
-                    for part in merged_line.geoms:
-                        score = part.distance(
-                            Point(start_lon, start_lat)
-                        ) + part.distance(Point(end_lon, end_lat))
-                        if score < best_score:
-                            best_score = score
-                            best_part = part
-                    merged_line = best_part if best_part else merged_line.geoms[0]
+                # Слитая геометрия улицы берется из кэша индекса улиц
+                merged_street = fast_service.get_merged_street(street_key)
+                if merged_street is None:
+                    raise ValueError("Merged street geometry is not available")
+
+                start_click = Point(start_lon, start_lat)
+                end_click = Point(end_lon, end_lat)
+
+                # Если улица состоит из нескольких частей, берём ту,
+                # где минимальная сумма расстояний до кликов
+                if len(merged_street.parts) == 1:
+                    merged_line = merged_street.parts[0]
+                else:
+                    scores = shapely.distance(
+                        merged_street.parts, start_click
+                    ) + shapely.distance(merged_street.parts, end_click)
+                    merged_line = merged_street.parts[int(scores.argmin())]
 
                 # Проекции
-                proj_start = merged_line.project(Point(start_lon, start_lat))
-                proj_end = merged_line.project(Point(end_lon, end_lat))
+                proj_start = merged_line.project(start_click)
+                proj_end = merged_line.project(end_click)
                 if proj_start > proj_end:
                     proj_start, proj_end = proj_end, proj_start
 
@@ -988,13 +1009,13 @@ class StreetService:
                     "Shapely merge+substring failed, fallback to topological",
                     error=str(shapely_local_err),
                 )
-                # Фолбэк – топологический алгоритм
+                # Фолбэк – топологический алгоритм (работает со списками координат)
                 path_data = self._build_full_path_between_points(
                     start_lat,
                     start_lon,
                     end_lat,
                     end_lon,
-                    street_segments,
+                    [segment.tolist() for segment in street_segments],
                 )
                 segment_coords = path_data["coordinates"]
 
@@ -1049,32 +1070,6 @@ class StreetService:
                 f"Ошибка вычисления сегмента улицы: {str(e)}"
             ) from e
 
-    def _convert_coordinates_format(self, coordinates: list) -> list:
-        """
-        Конвертирует координаты в формат [lon, lat] для GeoJSON
-
-        Args:
-            coordinates: Список координат в любом формате
-
-        Returns:
-            Список координат в формате [lon, lat]
-        """
-        converted_coords = []
-        for coord in coordinates:
-            if len(coord) == 2:
-                # Координаты могут быть в формате [lat, lon] или [lon, lat]
-                # Проверяем по диапазону значений для Харькова
-                if 35 <= coord[0] <= 37 and 49 <= coord[1] <= 51:
-                    # Формат [lon, lat]
-                    converted_coords.append([coord[0], coord[1]])
-                elif 35 <= coord[1] <= 37 and 49 <= coord[0] <= 51:
-                    # Формат [lat, lon] - переставляем
-                    converted_coords.append([coord[1], coord[0]])
-                else:
-                    # Если не можем определить, используем как есть
-                    converted_coords.append([coord[0], coord[1]])
-        return converted_coords
-
     def _build_full_path_between_points(
         self,
         start_lat: float,
@@ -0,0 +1,169 @@
+"""
+Пространственный индекс (STRtree) по всем сегментам улиц
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import shapely
+
+from .street_geometry_store import (
+    METERS_PER_DEGREE_LAT,
+    METERS_PER_DEGREE_LON,
+    GeometryStore,
+)
+
+
+class SegmentHit(NamedTuple):
+    """Сегмент улицы, найденный пространственным запросом"""
+
+    # Номер улицы в хранилище и номер сегмента внутри улицы
+    street_index: int
+    segment_index: int
+    # Расстояние от точки запроса до сегмента (метры)
+    distance_m: float
+    # Ближайшая к точке запроса точка сегмента
+    lat: float
+    lon: float
+
+
+class StreetSpatialIndex:
+    """
+    STRtree по всем сегментам улиц из бинарного хранилища
+
+    Сегменты переводятся в локальную равнопромежуточную проекцию (метры
+    относительно центра данных), поэтому расстояния в запросах задаются в
+    метрах, а погрешность в пределах города не превышает долей процента.
+    Каждый элемент дерева связан с номером улицы и номером ее сегмента.
+    """
+
+    def __init__(self, store: GeometryStore):
+        """
+        Args:
+            store: Открытое хранилище геометрии улиц ([lat, lon])
+        """
+        coords = store.coords
+        segment_offsets = store.segment_offsets.astype(np.int64)
+        street_offsets = store.street_offsets.astype(np.int64)
+
+        if len(coords):
+            self._lat0 = float(coords[:, 0].mean())
+            self._lon0 = float(coords[:, 1].mean())
+        else:
+            self._lat0 = self._lon0 = 0.0
+        self._meters_per_lon = METERS_PER_DEGREE_LON * np.cos(np.radians(self._lat0))
+
+        # Номер улицы и номер сегмента внутри улицы для каждого сегмента
+        segment_lengths = np.diff(segment_offsets)
+        segment_streets = np.repeat(
+            np.arange(len(street_offsets) - 1), np.diff(street_offsets)
+        )
+        segment_local = (
+            np.arange(len(segment_lengths)) - street_offsets[segment_streets]
+        )
+
+        # В дерево попадают только сегменты, являющиеся линиями
+        valid = segment_lengths >= 2
+        self._segment_streets = segment_streets[valid].astype(np.int32)
+        self._segment_local = segment_local[valid].astype(np.int32)
+        self._segment_ids = np.flatnonzero(valid)
+
+        self._lines = np.empty(0, dtype=object)
+        if valid.any():
+            point_segments = np.repeat(np.arange(len(segment_lengths)), segment_lengths)
+            point_mask = valid[point_segments]
+            projected = self._project(coords[point_mask, 0], coords[point_mask, 1])
+            # Номера линий должны идти подряд с нуля
+            line_ids = np.cumsum(valid) - 1
+            self._lines = shapely.linestrings(
+                projected, indices=line_ids[point_segments[point_mask]]
+            )
+        self._tree = shapely.STRtree(self._lines)
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def _project(self, lat, lon) -> np.ndarray:
+        """Координаты в метрах локальной проекции (x - восток, y - север)"""
+        x = (np.asarray(lon) - self._lon0) * self._meters_per_lon
+        y = (np.asarray(lat) - self._lat0) * METERS_PER_DEGREE_LAT
+        return np.column_stack([x, y])
+
+    def _hits(self, point, line_ids: np.ndarray) -> list[SegmentHit]:
+        lines = self._lines[line_ids]
+        distances = shapely.distance(lines, point)
+        nearest = shapely.line_interpolate_point(
+            lines, shapely.line_locate_point(lines, point)
+        )
+        xy = shapely.get_coordinates(nearest)
+        lats = self._lat0 + xy[:, 1] / METERS_PER_DEGREE_LAT
+        lons = self._lon0 + xy[:, 0] / self._meters_per_lon
+        return [
+            SegmentHit(
+                street_index=int(self._segment_streets[line_id]),
+                segment_index=int(self._segment_local[line_id]),
+                distance_m=float(distance),
+                lat=float(lat),
+                lon=float(lon),
+            )
+            for line_id, distance, lat, lon in zip(
+                line_ids, distances, lats, lons, strict=True
+            )
+        ]
+
+    def nearest(
+        self, lat: float, lon: float, max_distance_m: float | None = None
+    ) -> SegmentHit | None:
+        """
+        Ближайший к точке сегмент улицы
+
+        Args:
+            lat, lon: Координаты точки
+            max_distance_m: Максимальное расстояние поиска (метры)
+
+        Returns:
+            Ближайший сегмент или None, если в радиусе нет улиц
+        """
+        if not len(self._lines):
+            return None
+        point = shapely.points(self._project(lat, lon)[0])
+        line_ids = self._tree.query_nearest(point, max_distance=max_distance_m)
+        if not len(line_ids):
+            return None
+        return min(self._hits(point, line_ids), key=lambda hit: hit.distance_m)
+
+    def within(self, lat: float, lon: float, distance_m: float) -> list[SegmentHit]:
+        """
+        Все сегменты улиц в пределах расстояния от точки
+
+        Args:
+            lat, lon: Координаты точки
+            distance_m: Радиус поиска (метры)
+
+        Returns:
+            Сегменты по возрастанию расстояния
+        """
+        if not len(self._lines):
+            return []
+        point = shapely.points(self._project(lat, lon)[0])
+        line_ids = self._tree.query(point, predicate="dwithin", distance=distance_m)
+        return sorted(self._hits(point, line_ids), key=lambda hit: hit.distance_m)
+
+    def segments_in_bounds(
+        self, south: float, west: float, north: float, east: float
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Сегменты улиц, пересекающие прямоугольник в координатах
+
+        Args:
+            south, west, north, east: Границы прямоугольника (градусы)
+
+        Returns:
+            Номера улиц и сквозные номера сегментов в хранилище, по возрастанию
+            номера сегмента
+        """
+        if not len(self._lines):
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64)
+        (x_min, y_min), (x_max, y_max) = self._project([south, north], [west, east])
+        line_ids = np.sort(self._tree.query(shapely.box(x_min, y_min, x_max, y_max)))
+        return self._segment_streets[line_ids], self._segment_ids[line_ids]
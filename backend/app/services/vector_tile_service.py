@@ -0,0 +1,563 @@
+"""
+Векторные тайлы (MVT) с улицами и активными ремонтными работами
+
+Тайл собирается из локального хранилища улиц (уровень упрощения по
+масштабу, отбор сегментов через пространственный индекс) и геометрий
+активных ремонтных работ. Готовые тайлы кэшируются в памяти (LRU) и на
+диске (на диск не пишутся пустые тайлы, суммарный размер ограничен
+tile_disk_cache_mb). Тайлы вне охвата данных не собираются и не
+кэшируются. Ключ кэша включает версию данных: версию набора улиц и отпечаток
+таблицы ремонтных работ, поэтому изменения, сделанные другим процессом,
+тоже приводят к пересборке тайлов. Отпечаток перепроверяется не чаще раза
+в tile_works_check_seconds; запись работ в этом процессе лишь помечает его
+устаревшим. Тайлы прежних версий вытесняются из памяти LRU, а с диска
+удаляются в фоновом потоке.
+"""
+
+import hashlib
+import json
+import math
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+import shapely
+import structlog
+from shapely.errors import GEOSException
+from shapely.geometry import LineString, Point, shape
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..models import RepairWork, WorkStatus
+from ..utils.lru_cache import LRUCache
+from ..utils.mvt import (
+    GEOMETRY_LINESTRING,
+    GEOMETRY_POINT,
+    TILE_EXTENT,
+    TileFeature,
+    TileLayer,
+    encode_tile,
+)
+from .fast_geometry_service import (
+    FastGeometryService,
+    get_fast_geometry_service,
+    tolerance_for_zoom,
+)
+
+logger = structlog.get_logger(__name__)
+settings = get_settings()
+
+TILE_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+STREETS_LAYER = "streets"
+REPAIR_WORKS_LAYER = "repair_works"
+# Улицы не рисуются на мелких масштабах (весь город в нескольких тайлах)
+STREETS_MIN_ZOOM = 10
+# На более крупных масштабах клиент растягивает тайлы MAX_ZOOM (overzoom)
+MAX_ZOOM = 18
+# Запас вокруг тайла (в единицах тайла), чтобы линии не обрывались на стыках
+TILE_BUFFER = 64
+# Статусы работ, которые показываются на карте
+ACTIVE_WORK_STATUSES = (WorkStatus.PLANNED, WorkStatus.IN_PROGRESS, WorkStatus.DELAYED)
+
+
+class _WorksSnapshot(NamedTuple):
+    """Геометрии активных работ для одной версии таблицы работ"""
+
+    version: str
+    geometries: np.ndarray
+    properties: list[tuple[int, dict[str, Any]]]
+    tree: shapely.STRtree
+    # Охват всех геометрий (south, west, north, east) или None без работ
+    bounds: tuple[float, float, float, float] | None
+
+
+def tile_bounds(z: int, x: int, y: int) -> tuple[float, float, float, float]:
+    """
+    Границы тайла Web Mercator в градусах
+
+    Returns:
+        (south, west, north, east)
+    """
+    n = 2**z
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return south, west, north, east
+
+
+def _query_bounds(z: int, x: int, y: int) -> tuple[float, float, float, float]:
+    """Границы тайла с запасом в градусах, соответствующим TILE_BUFFER"""
+    south, west, north, east = tile_bounds(z, x, y)
+    margin_lon = (east - west) * TILE_BUFFER / TILE_EXTENT
+    margin_lat = (north - south) * TILE_BUFFER / TILE_EXTENT
+    return (
+        south - margin_lat,
+        west - margin_lon,
+        north + margin_lat,
+        east + margin_lon,
+    )
+
+
+def _intersects(
+    bounds: tuple[float, float, float, float],
+    other: tuple[float, float, float, float] | None,
+) -> bool:
+    """Пересекаются ли прямоугольники (south, west, north, east)"""
+    if other is None:
+        return False
+    south, west, north, east = bounds
+    other_south, other_west, other_north, other_east = other
+    return (
+        south <= other_north
+        and other_south <= north
+        and west <= other_east
+        and other_west <= east
+    )
+
+
+def _tile_transform(z: int, x: int, y: int, extent: int = TILE_EXTENT):
+    """Функция перевода координат [lon, lat] в координаты тайла"""
+    n = 2**z
+
+    def transform(coords: np.ndarray) -> np.ndarray:
+        lon = coords[:, 0]
+        lat = np.radians(coords[:, 1])
+        tile_x = (lon + 180.0) / 360.0 * n - x
+        tile_y = (1.0 - np.arcsinh(np.tan(lat)) / np.pi) / 2.0 * n - y
+        return np.column_stack([tile_x, tile_y]) * extent
+
+    return transform
+
+
+def _clip_to_tile(geometries: np.ndarray) -> np.ndarray:
+    """Обрезает геометрии в координатах тайла по границе тайла с запасом"""
+    return shapely.clip_by_rect(
+        geometries,
+        -TILE_BUFFER,
+        -TILE_BUFFER,
+        TILE_EXTENT + TILE_BUFFER,
+        TILE_EXTENT + TILE_BUFFER,
+    )
+
+
+def _feature_parts(geometry) -> tuple[int, list[list[tuple[int, int]]]] | None:
+    """Тип геометрии MVT и части (линии или точки) в целых координатах тайла"""
+    parts = [
+        part
+        for part in shapely.get_parts(geometry)
+        if not part.is_empty and part.geom_type in ("LineString", "Point", "LinearRing")
+    ]
+    lines = [part for part in parts if part.geom_type != "Point"]
+    if lines:
+        return GEOMETRY_LINESTRING, [
+            [(round(px), round(py)) for px, py in line.coords] for line in lines
+        ]
+    if parts:
+        return GEOMETRY_POINT, [[(round(p.x), round(p.y)) for p in parts]]
+    return None
+
+
+def repair_work_geometry(work: RepairWork):
+    """
+    Геометрия ремонтной работы в координатах [lon, lat]
+
+    Используется сохраненный GeoJSON сегмента улицы, иначе - отрезок между
+    началом и концом участка или точка работы.
+
+    Returns:
+        Геометрия shapely или None, если координат нет
+    """
+    if work.street_segment_geojson:
+        try:
+            data = json.loads(work.street_segment_geojson)
+            geometry = shape(data.get("geometry") or data)
+            if not geometry.is_empty:
+                return geometry
+        except (ValueError, TypeError, AttributeError, KeyError, GEOSException):
+            logger.warning("Invalid repair work GeoJSON", repair_work_id=work.id)
+
+    if None not in (
+        work.start_latitude,
+        work.start_longitude,
+        work.end_latitude,
+        work.end_longitude,
+    ):
+        return LineString(
+            [
+                (work.start_longitude, work.start_latitude),
+                (work.end_longitude, work.end_latitude),
+            ]
+        )
+    if work.latitude is not None and work.longitude is not None:
+        return Point(work.longitude, work.latitude)
+    return None
+
+
+def repair_works_version(db: Session) -> str:
+    """
+    Отпечаток таблицы ремонтных работ
+
+    Меняется при создании, изменении и удалении работ (включая изменения
+    из других процессов), вычисляется одним агрегирующим запросом.
+    """
+    row = db.query(
+        func.count(RepairWork.id),
+        func.max(RepairWork.id),
+        func.max(RepairWork.created_at),
+        func.max(RepairWork.updated_at),
+    ).one()
+    return hashlib.sha1(repr(tuple(row)).encode()).hexdigest()[:12]
+
+
+def load_active_works(db: Session, version: str) -> _WorksSnapshot:
+    """Загружает геометрии активных работ и строит по ним STRtree"""
+    works = (
+        db.query(RepairWork).filter(RepairWork.status.in_(ACTIVE_WORK_STATUSES)).all()
+    )
+
+    geometries = []
+    properties = []
+    for work in works:
+        geometry = repair_work_geometry(work)
+        if geometry is None:
+            continue
+        geometries.append(geometry)
+        properties.append(
+            (
+                work.id,
+                {
+                    "id": work.id,
+                    "status": work.status.value,
+                    "work_type_id": work.work_type_id,
+                    "street_name": work.street_name,
+                    "location": work.location,
+                    "start_datetime": work.start_datetime.isoformat()
+                    if work.start_datetime
+                    else None,
+                },
+            )
+        )
+
+    geometries_array = np.array(geometries, dtype=object)
+    bounds = None
+    if geometries:
+        west, south, east, north = shapely.total_bounds(geometries_array).tolist()
+        bounds = (south, west, north, east)
+    return _WorksSnapshot(
+        version=version,
+        geometries=geometries_array,
+        properties=properties,
+        tree=shapely.STRtree(geometries_array),
+        bounds=bounds,
+    )
+
+
+class VectorTileService:
+    """Сборка и кэширование векторных тайлов"""
+
+    def __init__(
+        self, cache_size: int, cache_dir: Path | None, disk_cache_bytes: int = 0
+    ):
+        self._tiles = LRUCache(cache_size)
+        self._cache_dir = cache_dir if disk_cache_bytes > 0 else None
+        self._disk_cache_bytes = disk_cache_bytes
+        # Тайлы текущей версии на диске в порядке использования: ключ -> размер.
+        # Учитываются тайлы, записанные или прочитанные этим процессом
+        self._disk_tiles: OrderedDict[tuple[str, int, int, int], int] = OrderedDict()
+        self._disk_bytes = 0
+        self._works: _WorksSnapshot | None = None
+        # Время последней проверки отпечатка таблицы работ (time.monotonic)
+        self._works_checked_at = -math.inf
+        # Счетчик invalidate(): проверка, начатая до записи работ, не должна
+        # продлевать срок действия отпечатка
+        self._works_generation = 0
+        # Версия данных, тайлы которой хранятся на диске
+        self._disk_version: str | None = None
+        self._lock = threading.Lock()
+
+    def get_tile(self, db: Session, z: int, x: int, y: int) -> bytes:
+        """
+        Возвращает тайл из кэша или собирает его
+
+        Args:
+            db: Сессия базы данных
+            z, x, y: Координаты тайла
+
+        Returns:
+            Байты тайла MVT (пустые, если в тайле нет объектов)
+        """
+        works = self._works_snapshot(db)
+        streets = get_fast_geometry_service()
+        version = self._data_version(streets, works)
+
+        # Тайлы вне охвата улиц и работ заведомо пусты: не собираем и не
+        # кэшируем их, чтобы обход карты не вытеснял полезные тайлы
+        bounds = _query_bounds(z, x, y)
+        if not _intersects(bounds, works.bounds) and not (
+            z >= STREETS_MIN_ZOOM and _intersects(bounds, streets.data_bounds)
+        ):
+            return b""
+
+        key = (version, z, x, y)
+        self._remove_stale_disk_versions(version)
+        tile = self._tiles.get(key)
+        if tile is not None:
+            return tile
+
+        tile = self._read_disk(key)
+        if tile is None:
+            tile = self._render(streets, works, bounds, z, x, y)
+            if tile:
+                self._write_disk(key, tile)
+        self._tiles.put(key, tile)
+        return tile
+
+    def invalidate(self) -> None:
+        """
+        Помечает отпечаток таблицы работ устаревшим
+
+        Следующий запрос тайла перепроверит отпечаток и, если он изменился,
+        будет собирать тайлы новой версии. Кэши не очищаются: тайлы старой
+        версии больше не запрашиваются и вытесняются сами.
+        """
+        with self._lock:
+            self._works_checked_at = -math.inf
+            self._works_generation += 1
+
+    def cache_stats(self) -> dict[str, Any]:
+        """Статистика кэша тайлов"""
+        stats = self._tiles.stats()
+        if self._cache_dir:
+            with self._lock:
+                stats["disk_entries"] = len(self._disk_tiles)
+                stats["disk_bytes"] = self._disk_bytes
+            stats["disk_max_bytes"] = self._disk_cache_bytes
+        return stats
+
+    def _works_snapshot(self, db: Session) -> _WorksSnapshot:
+        checked_at = time.monotonic()
+        with self._lock:
+            works = self._works
+            generation = self._works_generation
+            expired = (
+                checked_at - self._works_checked_at >= settings.tile_works_check_seconds
+            )
+        if works is not None and not expired:
+            return works
+
+        version = repair_works_version(db)
+        if works is None or works.version != version:
+            works = load_active_works(db, version)
+            logger.info(
+                "Active repair works loaded for tiles",
+                works_count=len(works.properties),
+                version=version,
+            )
+        with self._lock:
+            self._works = works
+            if generation == self._works_generation:
+                self._works_checked_at = checked_at
+        return works
+
+    @staticmethod
+    def _data_version(streets: FastGeometryService, works: _WorksSnapshot) -> str:
+        return hashlib.sha1(
+            repr((streets.data_version, works.version)).encode()
+        ).hexdigest()[:16]
+
+    def _remove_stale_disk_versions(self, version: str) -> None:
+        """
+        Удаляет с диска тайлы других версий данных в фоновом потоке
+
+        Вызывается на каждый запрос, но поток запускается только при смене
+        версии. Другой воркер, еще не увидевший смену версии, может снова
+        записать тайлы старой версии - они удалятся при следующей смене.
+        """
+        if not self._cache_dir:
+            return
+        with self._lock:
+            if self._disk_version == version:
+                return
+            self._disk_version = version
+            self._disk_tiles.clear()
+            self._disk_bytes = 0
+
+        def remove() -> None:
+            try:
+                version_dirs = [
+                    path for path in self._cache_dir.iterdir() if path.name != version
+                ]
+            except OSError:
+                return
+            for version_dir in version_dirs:
+                shutil.rmtree(version_dir, ignore_errors=True)
+            if version_dirs:
+                logger.info(
+                    "Stale vector tiles removed from disk",
+                    versions_count=len(version_dirs),
+                    version=version,
+                )
+
+        threading.Thread(target=remove, name="tile-cache-cleanup", daemon=True).start()
+
+    def _tile_path(self, key: tuple[str, int, int, int]) -> Path:
+        version, z, x, y = key
+        return self._cache_dir / version / str(z) / str(x) / f"{y}.mvt"
+
+    def _read_disk(self, key: tuple[str, int, int, int]) -> bytes | None:
+        if not self._cache_dir:
+            return None
+        try:
+            tile = self._tile_path(key).read_bytes()
+        except OSError:
+            return None
+        self._track_disk_tile(key, len(tile))
+        return tile
+
+    def _write_disk(self, key: tuple[str, int, int, int], tile: bytes) -> None:
+        if not self._cache_dir:
+            return
+        path = self._tile_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(tile)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Failed to write tile to disk", path=str(path), error=str(e))
+            return
+        self._track_disk_tile(key, len(tile))
+
+    def _track_disk_tile(self, key: tuple[str, int, int, int], size: int) -> None:
+        """
+        Учитывает тайл на диске и удаляет давно не использованные тайлы
+
+        Ограничение tile_disk_cache_mb действует на процесс: тайлы, которые
+        записал другой воркер и этот процесс не читал, не учитываются.
+        """
+        evicted = []
+        with self._lock:
+            if key[0] != self._disk_version:
+                return
+            self._disk_bytes += size - self._disk_tiles.pop(key, 0)
+            self._disk_tiles[key] = size
+            while self._disk_bytes > self._disk_cache_bytes and self._disk_tiles:
+                evicted_key, evicted_size = self._disk_tiles.popitem(last=False)
+                self._disk_bytes -= evicted_size
+                evicted.append(evicted_key)
+        for evicted_key in evicted:
+            self._tile_path(evicted_key).unlink(missing_ok=True)
+
+    def _render(
+        self,
+        streets: FastGeometryService,
+        works: _WorksSnapshot,
+        bounds: tuple[float, float, float, float],
+        z: int,
+        x: int,
+        y: int,
+    ) -> bytes:
+        transform = _tile_transform(z, x, y)
+        layers = [self._works_layer(works, transform, bounds)]
+        if z >= STREETS_MIN_ZOOM:
+            layers.append(self._streets_layer(streets, transform, bounds, z))
+        return encode_tile(layers)
+
+    @staticmethod
+    def _streets_layer(
+        streets: FastGeometryService, transform, bounds, z: int
+    ) -> TileLayer:
+        # Упрощение не заметнее четверти пикселя 256-пиксельного тайла
+        keys, coords, lengths = streets.street_segments_in_bounds(
+            *bounds, tolerance_m=tolerance_for_zoom(z) / 4
+        )
+        valid = lengths >= 2
+        if not valid.any():
+            return TileLayer(STREETS_LAYER, [])
+
+        # Хранилище - [lat, lon], тайлы - [lon, lat]
+        point_mask = np.repeat(valid, lengths)
+        lines = _clip_to_tile(
+            shapely.linestrings(
+                transform(coords[point_mask][:, ::-1]),
+                indices=np.repeat(np.arange(valid.sum()), lengths[valid]),
+            )
+        )
+
+        parts_by_street: dict[str, list] = {}
+        valid_keys = [
+            key for key, is_valid in zip(keys, valid, strict=True) if is_valid
+        ]
+        for street_key, line in zip(valid_keys, lines, strict=True):
+            parts = _feature_parts(line)
+            if parts and parts[0] == GEOMETRY_LINESTRING:
+                parts_by_street.setdefault(street_key, []).extend(parts[1])
+
+        features = [
+            TileFeature(
+                id=None,
+                geometry_type=GEOMETRY_LINESTRING,
+                parts=parts,
+                properties={
+                    "key": street_key,
+                    "name": streets.streets_data[street_key]["name"],
+                },
+            )
+            for street_key, parts in parts_by_street.items()
+        ]
+        return TileLayer(STREETS_LAYER, features)
+
+    @staticmethod
+    def _works_layer(works: _WorksSnapshot, transform, bounds) -> TileLayer:
+        south, west, north, east = bounds
+        work_ids = np.sort(works.tree.query(shapely.box(west, south, east, north)))
+        if not len(work_ids):
+            return TileLayer(REPAIR_WORKS_LAYER, [])
+
+        geometries = _clip_to_tile(
+            shapely.transform(works.geometries[work_ids], transform)
+        )
+
+        features = []
+        for work_index, geometry in zip(work_ids.tolist(), geometries, strict=True):
+            parts = _feature_parts(geometry)
+            if parts is None:
+                continue
+            work_id, properties = works.properties[work_index]
+            features.append(
+                TileFeature(
+                    id=work_id,
+                    geometry_type=parts[0],
+                    parts=parts[1],
+                    properties=properties,
+                )
+            )
+        return TileLayer(REPAIR_WORKS_LAYER, features)
+
+
+_vector_tile_service: VectorTileService | None = None
+
+
+def get_vector_tile_service() -> VectorTileService:
+    """Общий для процесса сервис векторных тайлов"""
+    global _vector_tile_service
+    if _vector_tile_service is None:
+        _vector_tile_service = VectorTileService(
+            settings.tile_cache_size,
+            Path(settings.tile_cache_dir) if settings.tile_cache_dir else None,
+            settings.tile_disk_cache_mb * 1024 * 1024,
+        )
+    return _vector_tile_service
+
+
+def invalidate_vector_tiles() -> None:
+    """Помечает тайлы устаревшими (вызывается при записи ремонтных работ)"""
+    if _vector_tile_service is not None:
+        _vector_tile_service.invalidate()
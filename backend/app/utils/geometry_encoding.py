@@ -0,0 +1,83 @@
+"""
+Компактные форматы передачи геометрии улиц
+
+- ``polyline``: алгоритм Google Encoded Polyline (с настраиваемой точностью);
+- ``quantized``: целые числа с точностью 1e-6 градуса, первая точка
+  абсолютная, остальные - разности с предыдущей: [lat0, lon0, dlat1, dlon1, ...].
+
+Обе кодировки работают с координатами в порядке [lat, lon].
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+
+# Количество знаков после запятой (1e-6 градуса ~ 11 см)
+GEOMETRY_PRECISION = 6
+
+
+def _quantized_deltas(points: Sequence[Sequence[float]], precision: int) -> np.ndarray:
+    """Разности целочисленных координат [lat, lon] (первая точка - абсолютная)"""
+    quantized = np.rint(np.asarray(points, dtype=np.float64) * 10**precision).astype(
+        np.int64
+    )
+    if not len(quantized):
+        return quantized.reshape(0, 2)
+    return np.diff(quantized, axis=0, prepend=np.zeros((1, 2), dtype=np.int64))
+
+
+def encode_polyline(
+    points: Sequence[Sequence[float]], precision: int = GEOMETRY_PRECISION
+) -> str:
+    """
+    Кодирует линию алгоритмом Google Encoded Polyline
+
+    Args:
+        points: Точки [[lat, lon], ...]
+        precision: Количество знаков после запятой
+
+    Returns:
+        Строка закодированной линии
+    """
+    chars = []
+    for value in _quantized_deltas(points, precision).ravel().tolist():
+        value = ~(value << 1) if value < 0 else value << 1
+        while value >= 0x20:
+            chars.append(chr((0x20 | (value & 0x1F)) + 63))
+            value >>= 5
+        chars.append(chr(value + 63))
+    return "".join(chars)
+
+
+def decode_polyline(
+    encoded: str, precision: int = GEOMETRY_PRECISION
+) -> list[list[float]]:
+    """Декодирует строку Google Encoded Polyline в точки [[lat, lon], ...]"""
+    values = []
+    value = shift = 0
+    for char in encoded:
+        byte = ord(char) - 63
+        value |= (byte & 0x1F) << shift
+        shift += 5
+        if byte < 0x20:
+            values.append(~(value >> 1) if value & 1 else value >> 1)
+            value = shift = 0
+
+    coords = np.cumsum(np.array(values, dtype=np.int64).reshape(-1, 2), axis=0)
+    return (coords / 10**precision).tolist()
+
+
+def encode_quantized(
+    points: Sequence[Sequence[float]], precision: int = GEOMETRY_PRECISION
+) -> list[int]:
+    """
+    Кодирует линию разностями целочисленных координат
+
+    Args:
+        points: Точки [[lat, lon], ...]
+        precision: Количество знаков после запятой
+
+    Returns:
+        Плоский список [lat0, lon0, dlat1, dlon1, ...]
+    """
+    return _quantized_deltas(points, precision).ravel().tolist()
@@ -0,0 +1,76 @@
+"""
+HTTP кэширование ответов: ETag, If-None-Match и Cache-Control
+"""
+
+import hashlib
+
+from fastapi import Response
+
+# Заголовок Cache-Control для ответов, которые нужно проверять при каждом запросе
+NO_CACHE = "no-cache"
+
+
+def make_etag(*parts: object) -> str:
+    """
+    Сильный ETag из частей версии ответа
+
+    Args:
+        parts: Версия набора данных, ключ улицы, параметры ответа и т.п.
+
+    Returns:
+        ETag в кавычках
+    """
+    digest = hashlib.sha1("\x1f".join(map(str, parts)).encode("utf-8"))
+    return f'"{digest.hexdigest()[:20]}"'
+
+
+def content_etag(content: bytes) -> str:
+    """ETag по содержимому ответа"""
+    return f'"{hashlib.sha1(content).hexdigest()[:20]}"'
+
+
+def public_cache_control(max_age: int) -> str:
+    """
+    Cache-Control для общих ответов, которые могут хранить браузер и прокси
+
+    При max_age = 0 ответ хранится, но проверяется при каждом использовании:
+    повторный запрос с совпавшим ETag обходится дешевым 304.
+    """
+    return f"public, max-age={max_age}" if max_age > 0 else f"public, {NO_CACHE}"
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Проверяет заголовок If-None-Match (слабое сравнение, RFC 9110)
+
+    Args:
+        if_none_match: Значение заголовка или None
+        etag: Текущий ETag ответа
+
+    Returns:
+        True, если у клиента актуальная версия
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque_tag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def cache_headers(
+    etag: str, cache_control: str, vary: str | None = None
+) -> dict[str, str]:
+    """Заголовки кэширования ответа (vary - заголовки, от которых зависит ответ)"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if vary:
+        headers["Vary"] = vary
+    return headers
+
+
+def not_modified(etag: str, cache_control: str, vary: str | None = None) -> Response:
+    """Ответ 304 Not Modified без тела"""
+    return Response(status_code=304, headers=cache_headers(etag, cache_control, vary))
@@ -0,0 +1,101 @@
+"""
+Потокобезопасный LRU кэш с ограничением размера и статистикой попаданий
+"""
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from threading import Lock
+from typing import Any
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    LRU кэш с ограниченным количеством записей
+
+    С max_bytes дополнительно ограничивается суммарный размер значений
+    (len значения, например байтов готового ответа).
+    """
+
+    def __init__(self, maxsize: int, max_bytes: int | None = None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Возвращает значение и помечает запись как недавно использованную"""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Добавляет запись, вытесняя самую старую при переполнении"""
+        if self.maxsize <= 0:
+            return
+        if self.max_bytes is not None and len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if self.max_bytes is not None:
+                previous = self._data.get(key)
+                self._bytes += len(value) - (len(previous) if previous else 0)
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                _, evicted = self._data.popitem(last=False)
+                if self.max_bytes is not None:
+                    self._bytes -= len(evicted)
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Возвращает значение из кэша или создает его через factory
+
+        factory вызывается вне блокировки, поэтому при гонке значение может
+        быть вычислено дважды - это допустимо для неизменяемых данных.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """
+        Очищает кэш
+
+        Статистика попаданий сохраняется: при периодической инвалидации
+        hit rate отражает работу кэша за все время, а не с последней очистки.
+        """
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, Any]:
+        """Статистика кэша для мониторинга"""
+        total = self.hits + self.misses
+        stats = {
+            "entries": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+        if self.max_bytes is not None:
+            stats["bytes"] = self._bytes
+            stats["max_bytes"] = self.max_bytes
+        return stats
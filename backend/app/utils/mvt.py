@@ -0,0 +1,193 @@
+"""
+Кодирование векторных тайлов в формате Mapbox Vector Tile (MVT 2.1)
+
+Минимальный кодировщик protobuf без внешних зависимостей: поддерживаются
+слои с линиями и точками и атрибуты строкового, целого, дробного и
+логического типов. Координаты геометрии передаются уже в системе тайла
+(0..extent, ось y направлена вниз).
+"""
+
+import math
+import struct
+from collections.abc import Iterable, Sequence
+from typing import Any, NamedTuple
+
+# Размер тайла в единицах геометрии
+TILE_EXTENT = 4096
+
+# Типы геометрии (vector_tile.proto, Tile.GeomType)
+GEOMETRY_POINT = 1
+GEOMETRY_LINESTRING = 2
+
+# Команды геометрии
+_COMMAND_MOVE_TO = 1
+_COMMAND_LINE_TO = 2
+
+# Типы полей protobuf
+_WIRE_VARINT = 0
+_WIRE_FIXED64 = 1
+_WIRE_LENGTH_DELIMITED = 2
+
+
+class TileFeature(NamedTuple):
+    """Объект слоя: линии или точки в координатах тайла"""
+
+    id: int | None
+    geometry_type: int
+    # Для линий - список линий, для точек - список из одной группы точек
+    parts: Sequence[Sequence[tuple[int, int]]]
+    properties: dict[str, Any]
+
+
+class TileLayer(NamedTuple):
+    """Слой тайла"""
+
+    name: str
+    features: list[TileFeature]
+    extent: int = TILE_EXTENT
+
+
+def _varint(value: int) -> bytes:
+    result = bytearray()
+    while value > 0x7F:
+        result.append((value & 0x7F) | 0x80)
+        value >>= 7
+    result.append(value)
+    return bytes(result)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint((field << 3) | wire_type)
+
+
+def _length_delimited(field: int, payload: bytes) -> bytes:
+    return _key(field, _WIRE_LENGTH_DELIMITED) + _varint(len(payload)) + payload
+
+
+def _packed_uint32(field: int, values: Iterable[int]) -> bytes:
+    return _length_delimited(field, b"".join(_varint(value) for value in values))
+
+
+def _encode_value(value: Any) -> bytes:
+    """Tile.Value: строка, double, sint64 или bool"""
+    if isinstance(value, bool):
+        return _key(7, _WIRE_VARINT) + _varint(int(value))
+    if isinstance(value, int):
+        return _key(6, _WIRE_VARINT) + _varint(_zigzag(value))
+    if isinstance(value, float):
+        return _key(3, _WIRE_FIXED64) + struct.pack("<d", value)
+    return _length_delimited(1, str(value).encode("utf-8"))
+
+
+def encode_geometry(
+    geometry_type: int, parts: Sequence[Sequence[tuple[int, int]]]
+) -> list[int]:
+    """
+    Кодирует геометрию в последовательность команд MVT
+
+    Координаты передаются как разности относительно предыдущей точки
+    (zigzag). Повторяющиеся подряд точки линий пропускаются, линии короче
+    двух различных точек отбрасываются.
+
+    Args:
+        geometry_type: GEOMETRY_POINT или GEOMETRY_LINESTRING
+        parts: Линии (или одна группа точек) в координатах тайла
+
+    Returns:
+        Целые числа для поля Feature.geometry
+    """
+    commands: list[int] = []
+    cursor_x = cursor_y = 0
+
+    if geometry_type == GEOMETRY_POINT:
+        points = [point for part in parts for point in part]
+        if not points:
+            return commands
+        commands.append((len(points) << 3) | _COMMAND_MOVE_TO)
+        for x, y in points:
+            commands.append(_zigzag(x - cursor_x))
+            commands.append(_zigzag(y - cursor_y))
+            cursor_x, cursor_y = x, y
+        return commands
+
+    for part in parts:
+        line = [part[0]] if part else []
+        for point in part[1:]:
+            if point != line[-1]:
+                line.append(point)
+        if len(line) < 2:
+            continue
+
+        x, y = line[0]
+        commands.append((1 << 3) | _COMMAND_MOVE_TO)
+        commands.append(_zigzag(x - cursor_x))
+        commands.append(_zigzag(y - cursor_y))
+        cursor_x, cursor_y = x, y
+
+        commands.append(((len(line) - 1) << 3) | _COMMAND_LINE_TO)
+        for x, y in line[1:]:
+            commands.append(_zigzag(x - cursor_x))
+            commands.append(_zigzag(y - cursor_y))
+            cursor_x, cursor_y = x, y
+    return commands
+
+
+def encode_layer(layer: TileLayer) -> bytes:
+    """Кодирует слой (Tile.Layer); пустая строка, если в слое нет объектов"""
+    keys: dict[str, int] = {}
+    values: dict[tuple[type, Any], int] = {}
+    encoded_features = []
+
+    for feature in layer.features:
+        geometry = encode_geometry(feature.geometry_type, feature.parts)
+        if not geometry:
+            continue
+
+        tags = []
+        for name, value in feature.properties.items():
+            if value is None:
+                continue
+            if isinstance(value, float) and not math.isfinite(value):
+                continue
+            tags.append(keys.setdefault(name, len(keys)))
+            tags.append(values.setdefault((type(value), value), len(values)))
+
+        payload = b""
+        if feature.id is not None:
+            payload += _key(1, _WIRE_VARINT) + _varint(feature.id)
+        if tags:
+            payload += _packed_uint32(2, tags)
+        payload += _key(3, _WIRE_VARINT) + _varint(feature.geometry_type)
+        payload += _packed_uint32(4, geometry)
+        encoded_features.append(_length_delimited(2, payload))
+
+    if not encoded_features:
+        return b""
+
+    payload = _key(15, _WIRE_VARINT) + _varint(2)
+    payload += _length_delimited(1, layer.name.encode("utf-8"))
+    payload += b"".join(encoded_features)
+    payload += b"".join(_length_delimited(3, key.encode("utf-8")) for key in keys)
+    payload += b"".join(
+        _length_delimited(4, _encode_value(value)) for _, value in values
+    )
+    payload += _key(5, _WIRE_VARINT) + _varint(layer.extent)
+    return payload
+
+
+def encode_tile(layers: Iterable[TileLayer]) -> bytes:
+    """
+    Кодирует тайл из слоев; пустые слои не записываются
+
+    Returns:
+        Байты Tile (пустые, если во всех слоях нет объектов)
+    """
+    return b"".join(
+        _length_delimited(3, encoded)
+        for encoded in (encode_layer(layer) for layer in layers)
+        if encoded
+    )
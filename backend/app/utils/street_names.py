@@ -0,0 +1,294 @@
+"""
+Нормализация названий улиц для поиска и сопоставления
+
+Все поиски по локальным данным улиц используют одну каноническую форму:
+нижний регистр, единый апостроф, сокращения типов улиц приведены к полной
+форме, варианты букв украинского и русского алфавитов совмещены.
+"""
+
+import re
+
+# Слова названия (после нормализации апострофы уже удалены)
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Сокращения с дефисом, которые иначе распались бы на два слова
+_HYPHENATED_ABBREVIATIONS = re.compile(r"\b(пр-т|пр-д|б-р)\b\.?")
+_HYPHENATED_EXPANSIONS = {"пр-т": "проспект", "пр-д": "проїзд", "б-р": "бульвар"}
+
+# Совмещение вариантов букв: апострофы, є/е, ї/і/и, ы/и, ё/э/е, ґ/г, ъ
+_LETTER_FOLDING = str.maketrans(
+    {
+        "'": None,
+        "’": None,
+        "ʼ": None,
+        "`": None,
+        "´": None,
+        "‘": None,
+        "ъ": None,
+        "є": "е",
+        "ё": "е",
+        "э": "е",
+        "ї": "и",
+        "і": "и",
+        "ы": "и",
+        "ґ": "г",
+    }
+)
+
+
+def normalize_street_text(text: str) -> str:
+    """
+    Приводит текст к нормализованному виду для сравнения
+
+    Args:
+        text: Название улицы или поисковый запрос
+
+    Returns:
+        Строка в нижнем регистре со совмещенными вариантами букв
+    """
+    lowered = _HYPHENATED_ABBREVIATIONS.sub(
+        lambda match: _HYPHENATED_EXPANSIONS[match.group(1)], text.lower()
+    )
+    return lowered.translate(_LETTER_FOLDING)
+
+
+def street_name_tokens(text: str) -> list[str]:
+    """Разбивает название улицы на нормализованные слова"""
+    return TOKEN_PATTERN.findall(normalize_street_text(text))
+
+
+def _fold(word: str) -> str:
+    return word.translate(_LETTER_FOLDING)
+
+
+# Типы улиц: нормализованное слово -> канонический тип
+STREET_TYPES: dict[str, str] = {
+    _fold(alias): _fold(street_type)
+    for street_type, aliases in {
+        "вулиця": ("вулиця", "вул", "улица", "ул"),
+        "проспект": ("проспект", "просп", "пр", "пр-т"),
+        "провулок": ("провулок", "пров", "переулок", "пер"),
+        "бульвар": ("бульвар", "бульв", "бул", "б-р"),
+        "площа": ("площа", "пл", "площадь"),
+        "майдан": ("майдан",),
+        "узвіз": ("узвіз", "спуск"),
+        "проїзд": ("проїзд", "проезд", "пр-д"),
+        "в'їзд": ("в'їзд", "въезд"),
+        "шосе": ("шосе", "шоссе"),
+        "набережна": ("набережна", "набережная", "наб"),
+        "тупик": ("тупик", "туп"),
+        "лінія": ("лінія", "линия"),
+        "алея": ("алея", "аллея"),
+    }.items()
+    for alias in aliases
+}
+
+
+# Латинские написания типов улиц (по латинскому скелету) -> канонический тип
+LATIN_STREET_TYPES: dict[str, str] = {}
+
+
+def split_street_type(text: str) -> tuple[str | None, list[str]]:
+    """
+    Отделяет тип улицы от собственного названия
+
+    Args:
+        text: Название улицы в любом написании ("вул. Сумська", "Сумська вулиця")
+
+    Returns:
+        Канонический тип улицы (или None) и нормализованные слова названия
+    """
+    street_type = None
+    words = []
+    for token in street_name_tokens(text):
+        canonical_type = STREET_TYPES.get(token)
+        if canonical_type is None and token.isascii():
+            canonical_type = LATIN_STREET_TYPES.get(latin_skeleton(token))
+        if canonical_type and street_type is None:
+            street_type = canonical_type
+        elif not canonical_type:
+            words.append(token)
+
+    # Название, состоящее только из "типа" (например, "Майдан"), оставляем как есть
+    if not words and street_type:
+        return None, [street_type]
+    return street_type, words
+
+
+def canonical_street_name(text: str, keep_type: bool = True) -> str:
+    """
+    Каноническая форма названия улицы, не зависящая от порядка слов
+
+    "вул. Сумська", "Сумська вулиця" и "СУМСЬКА вул." дают одну форму;
+    с keep_type=False тип улицы отбрасывается ("сумська").
+
+    Args:
+        text: Название улицы или поисковый запрос
+        keep_type: Сохранять ли тип улицы в канонической форме
+
+    Returns:
+        Каноническая строка (может быть пустой)
+    """
+    street_type, words = split_street_type(text)
+    if keep_type and street_type:
+        words = words + [street_type]
+    return " ".join(sorted(words))
+
+
+def street_name_variants(text: str) -> list[str]:
+    """
+    Канонические формы для поиска: сначала с типом улицы, затем без него
+
+    Для запросов латиницей возвращаются латинские формы (см.
+    latin_street_name_variants), для остальных - кириллические.
+    """
+    if has_latin(text):
+        return latin_street_name_variants(text)
+
+    variants = []
+    for form in (canonical_street_name(text), canonical_street_name(text, False)):
+        if form and form not in variants:
+            variants.append(form)
+    return variants
+
+
+# Официальная транслитерация украинского алфавита (постановление КМУ №55, 2010)
+_KMU_2010 = {
+    "а": "a", "б": "b", "в": "v", "г": "h", "ґ": "g", "д": "d", "е": "e",
+    "є": "ie", "ж": "zh", "з": "z", "и": "y", "і": "i", "ї": "i", "й": "i",
+    "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r",
+    "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch",
+    "ш": "sh", "щ": "shch", "ь": "", "ю": "iu", "я": "ia",
+    # Русские буквы в названиях из OSM
+    "ы": "y", "э": "e", "ё": "io", "ъ": "",
+}  # fmt: skip
+# В начале слова є, ї, й, ю, я передаются иначе
+_KMU_2010_WORD_START = {"є": "ye", "ї": "yi", "й": "y", "ю": "yu", "я": "ya"}
+_APOSTROPHES = "'’ʼ`´‘"
+
+# Латинский скелет: неофициальные варианты транслитерации сводятся к одному
+# написанию (kh/h/g, ts/c/tz, ch/c, ya/ia/ja/a, y/i/j, ...). Разбор идет слева
+# направо, более длинные сочетания имеют приоритет.
+_LATIN_SKELETON_RULES = {
+    "shch": "sc", "sch": "sc", "zgh": "zg", "kh": "h", "zh": "z", "ch": "c",
+    "sh": "s", "ts": "c", "tz": "c", "ck": "k", "ye": "e", "ie": "e",
+    "je": "e", "yu": "u", "iu": "u", "ju": "u", "ya": "a", "ia": "a",
+    "ja": "a", "yi": "i", "ji": "i", "g": "h", "y": "i", "j": "i", "w": "v",
+    "x": "ks", "q": "k",
+}  # fmt: skip
+_LATIN_SKELETON_PATTERN = re.compile(
+    "|".join(sorted(_LATIN_SKELETON_RULES, key=len, reverse=True))
+)
+_REPEATED_LETTERS = re.compile(r"([a-z])\1+")
+_LATIN_LETTER = re.compile(r"[a-z]", re.IGNORECASE)
+
+
+def has_latin(text: str) -> bool:
+    """Содержит ли текст латинские буквы"""
+    return _LATIN_LETTER.search(text) is not None
+
+
+def transliterate(text: str) -> str:
+    """
+    Транслитерирует украинский текст латиницей по правилам КМУ 2010
+
+    Латинские символы, цифры и знаки препинания сохраняются как есть.
+    """
+    result = []
+    previous_is_letter = False
+    lowered = text.lower()
+    for index, char in enumerate(lowered):
+        if char in _APOSTROPHES:
+            continue
+        if char == "г" and index > 0 and lowered[index - 1] == "з":
+            # "зг" передается как "zgh", чтобы отличать от "ж"
+            result.append("gh")
+        elif not previous_is_letter and char in _KMU_2010_WORD_START:
+            result.append(_KMU_2010_WORD_START[char])
+        else:
+            result.append(_KMU_2010.get(char, char))
+        previous_is_letter = char.isalpha()
+    return "".join(result)
+
+
+def latin_skeleton(text: str) -> str:
+    """Сводит латинское написание к скелету, общему для вариантов транслитерации"""
+    skeleton = _LATIN_SKELETON_PATTERN.sub(
+        lambda match: _LATIN_SKELETON_RULES[match.group(0)], text.lower()
+    )
+    return _REPEATED_LETTERS.sub(r"\1", skeleton)
+
+
+def latin_search_token(token: str) -> str:
+    """Латинский скелет слова, написанного кириллицей или латиницей"""
+    return latin_skeleton(transliterate(token))
+
+
+def search_tokens(text: str) -> list[str]:
+    """
+    Слова поискового запроса
+
+    Кириллические слова нормализуются (normalize_street_text), латинские -
+    сводятся к латинскому скелету для сравнения с транслитерацией названий.
+    """
+    return [
+        latin_skeleton(token) if token.isascii() else token
+        for token in street_name_tokens(text)
+    ]
+
+
+def latin_canonical_street_name(text: str, keep_type: bool = True) -> str:
+    """
+    Латинская каноническая форма названия улицы
+
+    Название на кириллице транслитерируется, запрос латиницей используется
+    как есть; обе стороны сводятся к латинскому скелету, поэтому "Sumska",
+    "Sumskaya vul." и "вулиця Сумська" дают совместимые формы.
+
+    Args:
+        text: Название улицы или поисковый запрос
+        keep_type: Сохранять ли тип улицы в канонической форме
+
+    Returns:
+        Каноническая строка (может быть пустой)
+    """
+    street_type, words = split_street_type(text)
+    if keep_type and street_type:
+        words = words + [street_type]
+    return " ".join(sorted(latin_search_token(word) for word in words))
+
+
+def latin_street_name_variants(text: str) -> list[str]:
+    """Латинские канонические формы: сначала с типом улицы, затем без него"""
+    variants = []
+    for form in (
+        latin_canonical_street_name(text),
+        latin_canonical_street_name(text, False),
+    ):
+        if form and form not in variants:
+            variants.append(form)
+    return variants
+
+
+LATIN_STREET_TYPES.update(
+    {
+        latin_skeleton(alias): _fold(street_type)
+        for street_type, aliases in {
+            "вулиця": ("vul", "vulytsia", "vulitsa", "ulitsa", "ul", "st", "street"),
+            "проспект": ("prosp", "prospekt", "prospect", "pr", "ave", "avenue"),
+            "провулок": ("prov", "provulok", "pereulok", "per", "lane"),
+            "бульвар": ("bulvar", "bulv", "blvd", "boulevard"),
+            "площа": ("ploshcha", "ploshchad", "pl", "square", "sq"),
+            "майдан": ("maidan", "maydan"),
+            "узвіз": ("uzviz", "spusk", "descent"),
+            "проїзд": ("proizd", "proyizd", "proezd", "passage"),
+            "в'їзд": ("vizd", "vyizd", "vyezd"),
+            "шосе": ("shose", "shosse", "highway"),
+            "набережна": ("naberezhna", "naberezhnaya", "nab", "embankment"),
+            "тупик": ("tupyk", "tupik"),
+            "лінія": ("liniia", "liniya", "line"),
+            "алея": ("aleia", "alleya", "alley"),
+        }.items()
+        for alias in aliases
+    }
+)
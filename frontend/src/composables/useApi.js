@@ -14,10 +14,12 @@ export function useApi() {
 
     // Улицы
     searchStreets: query => apiService.searchStreets(query),
-    getStreetGeometry: streetName => apiService.getStreetGeometry(streetName),
+    getStreetGeometry: (streetName, options) =>
+      apiService.getStreetGeometry(streetName, options),
     getStreetGeometryByOsm: (osmType, osmId) =>
       apiService.getStreetGeometryByOsm(osmType, osmId),
-    reverseGeocode: (lat, lon) => apiService.reverseGeocode(lat, lon),
+    reverseGeocode: (lat, lon, options) =>
+      apiService.reverseGeocode(lat, lon, options),
     calculateStreetSegment: segmentData =>
       apiService.calculateStreetSegment(segmentData),
 
@@ -3,6 +3,8 @@
  * Содержит все HTTP запросы и логику обработки ошибок
  */
 
+import { decodeStreetGeometry } from './geometryCodec.js';
+
 // Базовая конфигурация API
 const API_CONFIG = {
   BASE_URL: getApiBaseUrl(),
@@ -273,10 +275,19 @@ class ApiService {
 
   /**
    * Получить геометрию улицы по названию
+   * Сегменты передаются в компактном формате polyline и декодируются здесь,
+   * поэтому результат имеет обычный вид { segments: [[[lat, lon], ...]], ... }
    */
-  async getStreetGeometry(streetName) {
+  async getStreetGeometry(streetName, { streetKey = null } = {}) {
     const encodedName = encodeURIComponent(streetName);
-    return this.http.get(`/api/v1/streets/fast-geometry/${encodedName}`);
+    const params = new URLSearchParams({ format: 'polyline' });
+    if (streetKey) {
+      params.append('street_key', streetKey);
+    }
+    const geometry = await this.http.get(
+      `/api/v1/streets/fast-geometry/${encodedName}?${params.toString()}`
+    );
+    return decodeStreetGeometry(geometry);
   }
 
   /**
@@ -288,9 +299,15 @@ class ApiService {
 
   /**
    * Обратное геокодирование
+   * По умолчанию отвечает локальный индекс улиц (ближайшая улица без номера дома);
+   * houseNumber: true - полный адрес с номером дома через Nominatim
    */
-  async reverseGeocode(lat, lon) {
-    return this.http.get(`/api/v1/streets/reverse?lat=${lat}&lon=${lon}`);
+  async reverseGeocode(lat, lon, { houseNumber = false } = {}) {
+    const params = new URLSearchParams({ lat, lon });
+    if (houseNumber) {
+      params.append('house_number', 'true');
+    }
+    return this.http.get(`/api/v1/streets/reverse?${params.toString()}`);
   }
 
   /**
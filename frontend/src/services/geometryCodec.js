@@ -0,0 +1,69 @@
+/**
+ * Декодирование компактных форматов геометрии улиц
+ * (fast-geometry?format=polyline|quantized)
+ */
+
+/**
+ * Декодирует строку Google Encoded Polyline в точки [[lat, lon], ...]
+ */
+export function decodePolyline(encoded, precision = 6) {
+  const factor = 10 ** precision;
+  const points = [];
+  let index = 0;
+  let lat = 0;
+  let lon = 0;
+
+  const readValue = () => {
+    let result = 0;
+    let shift = 0;
+    let byte;
+    do {
+      byte = encoded.charCodeAt(index++) - 63;
+      // Умножение вместо сдвига: значения при точности 1e-6 выходят за 32 бита
+      result += (byte & 0x1f) * 2 ** shift;
+      shift += 5;
+    } while (byte >= 0x20);
+    return result % 2 === 1 ? -(result + 1) / 2 : result / 2;
+  };
+
+  while (index < encoded.length) {
+    lat += readValue();
+    lon += readValue();
+    points.push([lat / factor, lon / factor]);
+  }
+  return points;
+}
+
+/**
+ * Декодирует плоский массив разностей [lat0, lon0, dlat1, dlon1, ...]
+ */
+export function decodeQuantized(values, precision = 6) {
+  const factor = 10 ** precision;
+  const points = [];
+  let lat = 0;
+  let lon = 0;
+  for (let i = 0; i + 1 < values.length; i += 2) {
+    lat += values[i];
+    lon += values[i + 1];
+    points.push([lat / factor, lon / factor]);
+  }
+  return points;
+}
+
+/**
+ * Приводит ответ fast-geometry в любом формате к виду
+ * { coordinates: [], segments: [[[lat, lon], ...], ...], name, ... }
+ */
+export function decodeStreetGeometry(geometry) {
+  if (!geometry || !geometry.format || geometry.format === 'json') {
+    return geometry;
+  }
+
+  const { format, precision, segments, ...rest } = geometry;
+  const decode = format === 'polyline' ? decodePolyline : decodeQuantized;
+  return {
+    ...rest,
+    coordinates: [],
+    segments: segments.map(segment => decode(segment, precision))
+  };
+}
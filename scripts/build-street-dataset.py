@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Скрипт для сборки набора данных улиц из локальной выгрузки OpenStreetMap
+Читает .osm.pbf (нужен пакет osmium) или Overpass JSON и пишет
+kharkiv_streets_full.json вместе с бинарным хранилищем геометрии
+
+Пример выгрузки Overpass:
+    [out:json][timeout:300];
+    area["name:en"="Kharkiv"]["admin_level"="4"]->.city;
+    way(area.city)["highway"]["name"];
+    out geom;
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Добавляем корень проекта в путь
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.app.services.fast_geometry_service import (  # noqa: E402
+    STREETS_FULL_DATA_PATH,
+)
+from backend.app.services.osm_street_import import (  # noqa: E402
+    build_street_dataset,
+)
+from backend.app.services.street_geometry_store import store_path_for  # noqa: E402
+
+
+def main():
+    """Основная функция сборки"""
+    parser = argparse.ArgumentParser(description="Сборка набора данных улиц из OSM")
+    parser.add_argument("source", type=Path, help=".osm.pbf или Overpass JSON")
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=STREETS_FULL_DATA_PATH,
+        help="Путь к итоговому JSON (бинарное хранилище пишется рядом)",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Количество процессов для сборки геометрии",
+    )
+    args = parser.parse_args()
+
+    if not args.source.exists():
+        print(f"❌ Не найдена выгрузка OSM: {args.source}")
+        sys.exit(1)
+
+    print(f"🗺️  Сборка улиц: {args.source} -> {args.output}")
+    started_at = time.perf_counter()
+    try:
+        stats = build_street_dataset(args.source, args.output, args.workers)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - started_at
+
+    print(
+        f"✅ Готово за {elapsed:.2f} с: линий {stats['ways']}, "
+        f"улиц {stats['streets']}, сегментов {stats['segments']}, "
+        f"точек {stats['points']}"
+    )
+    print(f"📦 Хранилище: {store_path_for(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Скрипт для сборки бинарного хранилища геометрии улиц
+Читает frontend/static/data/kharkiv_streets_full.json и пишет рядом .bin файл
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+# Добавляем корень проекта в путь
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.app.services.fast_geometry_service import (  # noqa: E402
+    STREETS_FULL_DATA_PATH,
+)
+from backend.app.services.street_geometry_store import (  # noqa: E402
+    build_geometry_store,
+    store_path_for,
+)
+
+
+def main():
+    """Основная функция сборки"""
+    source_path = Path(sys.argv[1]) if len(sys.argv) > 1 else STREETS_FULL_DATA_PATH
+    target_path = (
+        Path(sys.argv[2]) if len(sys.argv) > 2 else store_path_for(source_path)
+    )
+
+    if not source_path.exists():
+        print(f"❌ Не найден файл улиц: {source_path}")
+        sys.exit(1)
+
+    print(f"🛣️  Сборка хранилища улиц: {source_path} -> {target_path}")
+    started_at = time.perf_counter()
+    stats = build_geometry_store(source_path, target_path)
+    elapsed = time.perf_counter() - started_at
+
+    print(
+        f"✅ Готово за {elapsed:.2f} с: улиц {stats['streets']}, "
+        f"сегментов {stats['segments']}, точек {stats['points']}, "
+        f"размер {os.path.getsize(target_path) / 1024 / 1024:.1f} МБ"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Общие настройки тестов
+"""
+
+# Устаревшие скрипты (см. legacy/README.md) не являются тестами pytest
+collect_ignore = ["legacy"]
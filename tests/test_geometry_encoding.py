@@ -0,0 +1,48 @@
+"""
+Тесты компактных форматов геометрии улиц (polyline, quantized)
+"""
+
+import numpy as np
+import pytest
+
+from backend.app.utils.geometry_encoding import (
+    GEOMETRY_PRECISION,
+    decode_polyline,
+    encode_polyline,
+    encode_quantized,
+)
+
+POINTS = [
+    [49.9935123, 36.2304456],
+    [49.9940001, 36.2310999],
+    [49.9939999, 36.2309],
+    [50.0501234, 35.9876543],
+]
+
+
+def test_encode_polyline_reference_example():
+    """Пример из описания алгоритма Google Encoded Polyline"""
+    points = [[38.5, -120.2], [40.7, -120.95], [43.252, -126.453]]
+    assert encode_polyline(points, precision=5) == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+    assert decode_polyline("_p~iF~ps|U_ulLnnqC_mqNvxq`@", precision=5) == points
+
+
+@pytest.mark.parametrize("precision", [5, GEOMETRY_PRECISION])
+def test_polyline_round_trip(precision):
+    """Декодированная линия совпадает с исходной с точностью кодирования"""
+    decoded = decode_polyline(encode_polyline(POINTS, precision), precision)
+    np.testing.assert_allclose(decoded, POINTS, rtol=0, atol=0.5 * 10**-precision)
+
+
+def test_encode_quantized_deltas():
+    """Первая точка абсолютная, остальные - разности целых координат"""
+    values = encode_quantized(POINTS)
+    assert values[:2] == [49993512, 36230446]
+    restored = np.cumsum(np.array(values).reshape(-1, 2), axis=0)
+    np.testing.assert_array_equal(restored, np.rint(np.array(POINTS) * 1e6))
+
+
+def test_empty_line():
+    assert encode_polyline([]) == ""
+    assert decode_polyline("") == []
+    assert encode_quantized([]) == []
@@ -0,0 +1,208 @@
+"""
+Тесты кодировщика векторных тайлов (Mapbox Vector Tile)
+"""
+
+import struct
+
+import pytest
+
+from backend.app.utils.mvt import (
+    GEOMETRY_LINESTRING,
+    GEOMETRY_POINT,
+    TILE_EXTENT,
+    TileFeature,
+    TileLayer,
+    encode_geometry,
+    encode_tile,
+)
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if byte < 0x80:
+            return value, pos
+
+
+def _read_message(data: bytes) -> list[tuple[int, object]]:
+    """Поля protobuf сообщения: (номер поля, значение) в порядке записи"""
+    fields = []
+    pos = 0
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        field, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == 1:
+            value = struct.unpack_from("<d", data, pos)[0]
+            pos += 8
+        elif wire_type == 2:
+            size, pos = _read_varint(data, pos)
+            value = data[pos : pos + size]
+            pos += size
+        else:
+            raise ValueError(f"Unexpected wire type {wire_type}")
+        fields.append((field, value))
+    return fields
+
+
+def _packed(data: bytes) -> list[int]:
+    values = []
+    pos = 0
+    while pos < len(data):
+        value, pos = _read_varint(data, pos)
+        values.append(value)
+    return values
+
+
+def _unzigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+def _decode_value(data: bytes):
+    field, value = _read_message(data)[0]
+    if field == 1:
+        return value.decode("utf-8")
+    if field == 6:
+        return _unzigzag(value)
+    if field == 7:
+        return bool(value)
+    return value
+
+
+def _decode_tile(data: bytes) -> dict[str, dict]:
+    """Разбирает тайл: слой -> {version, extent, features}"""
+    layers = {}
+    for field, layer_data in _read_message(data):
+        assert field == 3
+        layer_fields = _read_message(layer_data)
+        keys = [value.decode("utf-8") for f, value in layer_fields if f == 3]
+        values = [_decode_value(value) for f, value in layer_fields if f == 4]
+        features = []
+        for f, feature_data in layer_fields:
+            if f != 2:
+                continue
+            feature = dict(_read_message(feature_data))
+            tags = _packed(feature.get(2, b""))
+            features.append(
+                {
+                    "id": feature.get(1),
+                    "type": feature[3],
+                    "geometry": _packed(feature[4]),
+                    "properties": {
+                        keys[k]: values[v]
+                        for k, v in zip(tags[::2], tags[1::2], strict=True)
+                    },
+                }
+            )
+        fields = dict(layer_fields)
+        layers[fields[1].decode("utf-8")] = {
+            "version": fields[15],
+            "extent": fields[5],
+            "features": features,
+        }
+    return layers
+
+
+def test_encode_geometry_specification_examples():
+    """Примеры кодирования геометрии из спецификации MVT 2.1"""
+    assert encode_geometry(GEOMETRY_POINT, [[(25, 17)]]) == [9, 50, 34]
+    assert encode_geometry(GEOMETRY_POINT, [[(5, 7), (3, 2)]]) == [17, 10, 14, 3, 9]
+    line = [(2, 2), (2, 10), (10, 10)]
+    assert encode_geometry(GEOMETRY_LINESTRING, [line]) == [9, 4, 4, 18, 0, 16, 16, 0]
+    multi_line = [9, 4, 4, 18, 0, 16, 16, 0, 9, 17, 17, 10, 4, 8]
+    assert encode_geometry(GEOMETRY_LINESTRING, [line, [(1, 1), (3, 5)]]) == multi_line
+
+
+def test_encode_geometry_drops_repeated_points_and_degenerate_lines():
+    """Повторы точек пропускаются, линии из одной точки отбрасываются"""
+    assert encode_geometry(
+        GEOMETRY_LINESTRING, [[(2, 2), (2, 2), (2, 10)], [(7, 7), (7, 7)], []]
+    ) == encode_geometry(GEOMETRY_LINESTRING, [[(2, 2), (2, 10)]])
+    assert encode_geometry(GEOMETRY_LINESTRING, [[(1, 1), (1, 1)]]) == []
+
+
+def _sample_layers() -> list[TileLayer]:
+    return [
+        TileLayer(
+            "streets",
+            [
+                TileFeature(
+                    1,
+                    GEOMETRY_LINESTRING,
+                    [[(0, 0), (100, 200), (-64, 4160)]],
+                    {"key": "сумська вулиця", "segments": 3, "main": True},
+                ),
+                TileFeature(2, GEOMETRY_LINESTRING, [[(5, 5)]], {"key": "пусто"}),
+            ],
+        ),
+        TileLayer(
+            "repair_works",
+            [
+                TileFeature(
+                    7,
+                    GEOMETRY_POINT,
+                    [[(2048, 1024)]],
+                    {"status": "planned", "delta": -3, "km": 1.5, "note": None},
+                )
+            ],
+        ),
+        TileLayer("empty", []),
+    ]
+
+
+def test_encode_tile_round_trip():
+    """Слои, идентификаторы, атрибуты и геометрия читаются обратно"""
+    layers = _decode_tile(encode_tile(_sample_layers()))
+
+    assert list(layers) == ["streets", "repair_works"]
+    streets = layers["streets"]
+    assert streets["version"] == 2
+    assert streets["extent"] == TILE_EXTENT
+    # Объект без геометрии после отбрасывания вырожденных линий не записывается
+    assert streets["features"] == [
+        {
+            "id": 1,
+            "type": GEOMETRY_LINESTRING,
+            "geometry": encode_geometry(
+                GEOMETRY_LINESTRING, [[(0, 0), (100, 200), (-64, 4160)]]
+            ),
+            "properties": {"key": "сумська вулиця", "segments": 3, "main": True},
+        }
+    ]
+    works = layers["repair_works"]["features"]
+    assert works[0]["id"] == 7
+    assert works[0]["type"] == GEOMETRY_POINT
+    assert works[0]["properties"] == {"status": "planned", "delta": -3, "km": 1.5}
+
+
+def test_encode_tile_without_features_is_empty():
+    assert encode_tile([TileLayer("streets", []), TileLayer("works", [])]) == b""
+
+
+def test_encode_tile_decodes_with_mapbox_vector_tile():
+    """Сверка с эталонным декодером, если он установлен"""
+    mapbox_vector_tile = pytest.importorskip("mapbox_vector_tile")
+
+    tile = mapbox_vector_tile.decode(
+        encode_tile(_sample_layers()), default_options={"y_coord_down": True}
+    )
+
+    street = tile["streets"]["features"][0]
+    assert street["id"] == 1
+    assert street["geometry"] == {
+        "type": "LineString",
+        "coordinates": [[0, 0], [100, 200], [-64, 4160]],
+    }
+    assert street["properties"] == {
+        "key": "сумська вулиця",
+        "segments": 3,
+        "main": True,
+    }
+    work = tile["repair_works"]["features"][0]
+    assert work["geometry"] == {"type": "Point", "coordinates": [2048, 1024]}
+    assert work["properties"] == {"status": "planned", "delta": -3, "km": 1.5}
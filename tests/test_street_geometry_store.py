@@ -0,0 +1,173 @@
+"""
+Тесты потокового разбора JSON и бинарного хранилища геометрии улиц
+"""
+
+import io
+import json
+import math
+import os
+
+import numpy as np
+import pytest
+
+from backend.app.services.street_geometry_store import (
+    SIMPLIFY_TOLERANCES_M,
+    GeometryStore,
+    build_geometry_store,
+    is_store_stale,
+    iter_json_object_items,
+    open_geometry_store,
+    store_path_for,
+)
+
+JSON_DOCUMENTS = [
+    "{}",
+    ' \n{ "a" : 1 , "b":[1, 2.5e-3, -7], "c": {"d": null, "e": [true, false]}}\n',
+    '{"вул. Сумська": "\\u0441\\"x\\\\", "пусто": "", "n": [[[49.99, 36.23]]]}',
+    json.dumps(
+        {f"вулиця {i}": [{"name": f"Вулиця {i}", "v": [i] * i}] for i in range(40)},
+        ensure_ascii=False,
+    ),
+]
+
+
+@pytest.mark.parametrize("document", JSON_DOCUMENTS)
+@pytest.mark.parametrize("chunk_size", range(1, 65))
+def test_iter_json_object_items_matches_json_loads(document, chunk_size):
+    """Разбор по блокам любого размера совпадает с json.loads"""
+    items = list(iter_json_object_items(io.StringIO(document), chunk_size))
+    assert items == list(json.loads(document).items())
+
+
+@pytest.mark.parametrize(
+    "document", ["[1, 2]", '{"a": 1', '{"a" 1}', '{"a": 1; "b": 2}', '{"a": [1, }']
+)
+def test_iter_json_object_items_rejects_malformed(document):
+    """Некорректный JSON приводит к ValueError"""
+    with pytest.raises(ValueError):
+        list(iter_json_object_items(io.StringIO(document), 4))
+
+
+def _zigzag(lat: float, lon: float, points: int) -> list[list[float]]:
+    """Линия с мелкими изломами, которые убираются упрощением"""
+    return [
+        [lat + i * 0.0005, lon + (0.00001 if i % 2 else 0.0) + i * 0.0001]
+        for i in range(points)
+    ]
+
+
+@pytest.fixture
+def streets_json(tmp_path):
+    data = {
+        "сумська вулиця": [
+            {"name": "Сумська вулиця", "coordinates": _zigzag(49.99, 36.23, 50)},
+            {"name": "Сумська вулиця", "coordinates": [[49.95, 36.2], [49.96, 36.21]]},
+        ],
+        # Координаты в порядке [lon, lat] нормализуются при сборке
+        "проспект науки": [
+            {"name": "проспект Науки", "coordinates": [[36.22, 50.01], [36.23, 50.02]]}
+        ],
+        "без сегментов": [],
+        "без координат": [
+            {"name": "Без координат", "coordinates": []},
+            {"name": "Без координат", "coordinates": [[49.9, 36.1], [49.91, 36.11]]},
+        ],
+    }
+    path = tmp_path / "kharkiv_streets_full.json"
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def test_store_round_trip(streets_json, tmp_path):
+    """Геометрия, ключи и названия читаются из хранилища без изменений"""
+    store_path = tmp_path / "streets.bin"
+    stats = build_geometry_store(streets_json, store_path)
+    store = GeometryStore(store_path)
+
+    assert stats["streets"] == 3
+    assert store.keys == ["сумська вулиця", "проспект науки", "без координат"]
+    assert store.names == ["Сумська вулиця", "проспект Науки", "Без координат"]
+    assert [store.segments_count(i) for i in range(3)] == [2, 1, 1]
+
+    expected = {
+        0: [_zigzag(49.99, 36.23, 50), [[49.95, 36.2], [49.96, 36.21]]],
+        1: [[[50.01, 36.22], [50.02, 36.23]]],
+        2: [[[49.9, 36.1], [49.91, 36.11]]],
+    }
+    for street_index, segments in expected.items():
+        assert [
+            segment.tolist() for segment in store.street_segments(street_index)
+        ] == segments
+        assert store.decode(store.locate(street_index)) == segments
+
+
+def test_store_simplified_levels(streets_json, tmp_path):
+    """Упрощенные уровни сохраняют сегменты и их концы и уменьшают число точек"""
+    store_path = tmp_path / "streets.bin"
+    build_geometry_store(streets_json, store_path)
+    store = GeometryStore(store_path)
+
+    assert [level.tolerance_m for level in store.levels] == [
+        0.0,
+        *SIMPLIFY_TOLERANCES_M,
+    ]
+    full = store.street_segments(0)
+    previous_points = sum(len(segment) for segment in full)
+    for level in range(1, len(store.levels)):
+        segments = store.street_segments(0, level)
+        assert len(segments) == len(full)
+        for simplified, original in zip(segments, full, strict=True):
+            # Концы сохраняются с точностью обратной проекции из метров
+            np.testing.assert_allclose(
+                simplified[[0, -1]], original[[0, -1]], rtol=0, atol=1e-9
+            )
+        points = sum(len(segment) for segment in segments)
+        assert points <= previous_points
+        previous_points = points
+        assert store.decode(store.locate(0, level)) == [
+            segment.tolist() for segment in segments
+        ]
+    assert previous_points < sum(len(segment) for segment in full)
+
+    assert store.level_for_tolerance(0.0) == 0
+    assert store.level_for_tolerance(SIMPLIFY_TOLERANCES_M[1]) == 2
+    assert store.level_for_tolerance(math.inf) == len(SIMPLIFY_TOLERANCES_M)
+
+
+def test_store_content_hash_depends_only_on_data(streets_json, tmp_path):
+    """Хэш содержимого одинаков для одинаковых данных и меняется вместе с ними"""
+    build_geometry_store(streets_json, tmp_path / "a.bin")
+    build_geometry_store(streets_json, tmp_path / "b.bin")
+    first = GeometryStore(tmp_path / "a.bin").content_hash
+    assert first == GeometryStore(tmp_path / "b.bin").content_hash
+
+    streets_json.write_text(
+        '{"вулиця": [{"coordinates": [[49.9, 36.1], [49.8, 36.2]]}]}',
+        encoding="utf-8",
+    )
+    build_geometry_store(streets_json, tmp_path / "c.bin")
+    assert first != GeometryStore(tmp_path / "c.bin").content_hash
+
+
+def test_open_geometry_store_builds_missing_store(streets_json):
+    """Хранилище собирается рядом с JSON файлом при первом открытии"""
+    assert not store_path_for(streets_json).exists()
+    store = open_geometry_store(streets_json)
+    assert store_path_for(streets_json).exists()
+    assert store.streets_count == 3
+
+
+def test_store_rebuilt_for_replaced_json_with_older_mtime(streets_json):
+    """JSON, замененный копией со старым mtime (cp -p), пересобирает хранилище"""
+    store_path = store_path_for(streets_json)
+    open_geometry_store(streets_json)
+    assert not is_store_stale(streets_json, store_path)
+
+    data = json.loads(streets_json.read_text(encoding="utf-8"))
+    data["нова вулиця"] = [{"name": "Нова вулиця", "coordinates": [[49.9, 36.1]] * 2}]
+    streets_json.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    old_mtime = store_path.stat().st_mtime_ns - 10**9
+    os.utime(streets_json, ns=(old_mtime, old_mtime))
+
+    assert is_store_stale(streets_json, store_path)
+    assert "нова вулиця" in open_geometry_store(streets_json).keys